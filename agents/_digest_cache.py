@@ -0,0 +1,94 @@
+# agents/_digest_cache.py
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+# bump when the per-paper digest prompt or shape changes; old rows stop matching
+DIGEST_PROMPT_VERSION = 1
+
+_ARXIV_RE = re.compile(r"arxiv\.org/(?:abs|pdf)/([^?#\s]+?)(?:v\d+)?(?:\.pdf)?/?$", re.I)
+
+
+def paper_id(p: Dict) -> str:
+    """
+    Stable identity for a paper: the arXiv id without version, else its URL,
+    else its normalized title.
+    """
+    url = (p.get("url") or "").strip()
+    m = _ARXIV_RE.search(url)
+    if m:
+        return f"arxiv:{m.group(1)}"
+    return url or "title:" + " ".join((p.get("title") or "").lower().split())
+
+
+def digest_key(p: Dict, model: str) -> str:
+    blob = json.dumps([paper_id(p), model, DIGEST_PROMPT_VERSION])
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class DigestCache:
+    """
+    SQLite store of per-paper digests with LRU eviction by last access. No
+    TTL: a digest only goes stale with the model or prompt version, and both
+    are part of the key. Safe to share between threads.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS digests ("
+            " key TEXT PRIMARY KEY, digest TEXT NOT NULL,"
+            " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_digest_accessed ON digests(accessed_at)")
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict]:
+        found = {}
+        now = time.time()
+        keys = list(dict.fromkeys(keys))
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, digest FROM digests WHERE key IN ({marks})", chunk
+                ).fetchall()
+                found.update((k, json.loads(d)) for k, d in rows)
+            if found:
+                self._conn.executemany(
+                    "UPDATE digests SET accessed_at = ? WHERE key = ?", [(now, k) for k in found]
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, digests: Dict[str, Dict]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO digests (key, digest, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(k, json.dumps(d, ensure_ascii=False), now, now) for k, d in digests.items()],
+            )
+            self._conn.execute(
+                "DELETE FROM digests WHERE key IN ("
+                " SELECT key FROM digests ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+        return {"entries": entries}
@@ -1,23 +1,818 @@
 
 from config.settings import settings
-import os, litellm
+from agents._llm_cache import LLMCache, make_key
+from agents import telemetry
+from agents.context import count_tokens
+import asyncio, heapq, itertools, math, os, threading, time
+from contextlib import asynccontextmanager, contextmanager
 
-def chat_completion(messages):
-    provider = settings.llm_provider.lower()
+MOCK_CONTENT = "{\"paragraphs\":[\"Mock paragraph 1\",\"Mock paragraph 2\",\"Mock paragraph 3\"],\"whats_new\":[\"Mock new 1\",\"Mock new 2\"],\"open_problems\":[\"Mock open 1\"],\"top5_papers\":[{\"title\":\"Mock\",\"url\":\"http://example.com\"}]}"
+FALLBACK_CONTENT = "{\"paragraphs\":[\"Fallback 1\",\"Fallback 2\",\"Fallback 3\"],\"whats_new\":[\"A\",\"B\"],\"open_problems\":[\"C\"],\"top5_papers\":[{\"title\":\"T\",\"url\":\"U\"}]}"
+
+_cache = None
+
+# governor queue order: lower runs first, FIFO within a priority
+PRIORITY_PLAN = 0
+PRIORITY_SUMMARY = 10
+PRIORITY_DIGEST = 20
+
+
+def _litellm():
+    """
+    litellm on first use: importing it takes seconds, which the API process
+    should not pay at startup (or at all with the mock provider).
+    """
+    import litellm
+
+    return litellm
+
+
+def _content_response(content):
+    return {"choices":[{"message":{"content":content}}]}
+
+
+def _mock_delay(content):
+    """
+    Simulated provider time for mock answers: MOCK_LLM_LATENCY_S up front
+    plus ~4 chars/token at MOCK_LLM_TOKENS_PER_S (0 = instant).
+    """
+    delay = settings.mock_llm_latency_s
+    if settings.mock_llm_tokens_per_s > 0:
+        delay += (len(content) / 4) / settings.mock_llm_tokens_per_s
+    return delay
+
+
+def _record_mock(provider, messages, content, label="mock"):
+    # ~4 chars/token, so benchmarks against the mock still show token flow
+    telemetry.LLM_REQUESTS.labels(provider, label, "mock").inc()
+    telemetry.record_usage(provider, label, sum(len(m.get("content") or "") for m in messages) // 4, len(content) // 4)
+
+
+def _record_call(provider, model, started, out):
+    telemetry.LLM_SECONDS.labels(provider, model).observe(time.perf_counter() - started)
+    telemetry.LLM_REQUESTS.labels(provider, model, "ok").inc()
+    usage = telemetry.usage_of(out)
+    if usage:
+        telemetry.record_usage(provider, model, *usage)
+
+
+def _record_error(provider, model):
+    telemetry.LLM_REQUESTS.labels(provider, model, "error").inc()
+
+
+def _record_cache_lookup(provider, model, hit):
+    telemetry.record_cache("llm", "hit" if hit else "miss")
+    if hit:
+        telemetry.LLM_REQUESTS.labels(provider, model, "cache_hit").inc()
+
+
+def _count_prompt(model, messages):
+    try:
+        return _litellm().token_counter(model=model, messages=messages)
+    except Exception:
+        return sum(len(m.get("content") or "") for m in messages) // 4
+
+
+class LLMOverloaded(Exception):
+    """
+    Raised instead of queueing when a provider's wait queue is full.
+    retry_after is a hint in whole seconds.
+    """
+
+    def __init__(self, provider, retry_after):
+        super().__init__(f"{provider} LLM queue is full; retry in {retry_after}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("tokens", "wake", "state", "used", "granted_at")
+
+    def __init__(self, tokens, wake):
+        self.tokens = tokens
+        self.wake = wake
+        self.state = "waiting"  # -> granted -> done, or -> cancelled
+        self.used = None  # actual tokens, set by the caller once known
+        self.granted_at = None
+
+
+class Governor:
+    """
+    Admission control for one provider, shared by every thread and event
+    loop in the process: at most max_concurrency calls in flight, a
+    tokens-per-minute bucket, and a priority queue (FIFO within a priority)
+    of at most max_queue waiters. 0 disables a limit.
+    """
+
+    def __init__(self, provider, max_concurrency=0, tpm=0, max_queue=0):
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        self.tpm = tpm
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._heap = []
+        self._seq = itertools.count()
+        self._timer = None
+        self._tokens = float(tpm)
+        self._refilled = time.monotonic()
+        self._hold_s = 5.0  # moving average of slot hold time, for Retry-After
+        self.queued = 0
+        self.active = 0
+        self.rejected = 0
+
+    def retry_after(self):
+        waves = (self.queued + 1) / (self.max_concurrency or 1)
+        return max(1, min(60, math.ceil(waves * self._hold_s)))
+
+    def full(self):
+        return bool(self.max_queue) and self.queued >= self.max_queue
+
+    def _dispatch(self):
+        # caller holds the lock; returns the wake callbacks to run after releasing it
+        woken = []
+        if self.tpm:
+            now = time.monotonic()
+            self._tokens = min(self.tpm, self._tokens + (now - self._refilled) * self.tpm / 60)
+            self._refilled = now
+        while self._heap:
+            w = self._heap[0][2]
+            if w.state != "waiting":
+                heapq.heappop(self._heap)
+                continue
+            if self.max_concurrency and self.active >= self.max_concurrency:
+                break
+            if self.tpm and self._tokens < min(w.tokens, self.tpm):
+                # the head waits for the bucket; nothing may overtake it
+                self._schedule((min(w.tokens, self.tpm) - self._tokens) * 60 / self.tpm)
+                break
+            heapq.heappop(self._heap)
+            self.queued -= 1
+            self.active += 1
+            if self.tpm:
+                self._tokens -= w.tokens
+            w.state, w.granted_at = "granted", time.monotonic()
+            woken.append(w.wake)
+        return woken
+
+    def _schedule(self, delay):
+        if self._timer is None:
+            self._timer = threading.Timer(delay, self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            woken = self._dispatch()
+        for wake in woken:
+            wake()
+
+    def _enqueue(self, priority, tokens, wake):
+        with self._lock:
+            if self.full():
+                self.rejected += 1
+                raise LLMOverloaded(self.provider, self.retry_after())
+            w = _Waiter(tokens, wake)
+            heapq.heappush(self._heap, (priority, next(self._seq), w))
+            self.queued += 1
+            woken = self._dispatch()
+        for wake in woken:
+            wake()
+        return w
+
+    def _leave(self, w):
+        # cancels a waiter, or releases its slot if it was already granted
+        with self._lock:
+            if w.state == "waiting":
+                w.state = "cancelled"
+                self.queued -= 1
+            elif w.state == "granted":
+                w.state = "done"
+                self.active -= 1
+                held = time.monotonic() - w.granted_at
+                self._hold_s = 0.8 * self._hold_s + 0.2 * held
+                if self.tpm and w.used is not None:
+                    self._tokens += w.tokens - w.used
+            else:
+                return
+            woken = self._dispatch()
+        for wake in woken:
+            wake()
+
+    @contextmanager
+    def slot(self, priority=PRIORITY_SUMMARY, tokens=0, timeout=None):
+        """
+        Blocks the calling thread until the call may run. Raises
+        TimeoutError if that takes longer than timeout.
+        """
+        granted = threading.Event()
+        w = self._enqueue(priority, tokens, granted.set)
+        if not granted.wait(timeout):
+            self._leave(w)
+            raise TimeoutError(f"waited {timeout}s for an {self.provider} LLM slot")
+        try:
+            yield w
+        finally:
+            self._leave(w)
+
+    @asynccontextmanager
+    async def aslot(self, priority=PRIORITY_SUMMARY, tokens=0):
+        """
+        Async slot; cancelling the awaiting task (e.g. asyncio.wait_for
+        timing out) takes the call out of the queue or frees its slot.
+        """
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        w = self._enqueue(priority, tokens, wake)
+        try:
+            if w.state == "waiting":
+                await granted
+            yield w
+        finally:
+            self._leave(w)
+
+
+_governors = {}
+_governors_lock = threading.Lock()
+
+
+def get_governor(provider=None):
+    """
+    The process-wide Governor for a provider (default: the configured one).
+    """
+    provider = (provider or settings.llm_provider).lower()
+    with _governors_lock:
+        gov = _governors.get(provider)
+        if gov is None:
+            gov = _governors[provider] = Governor(
+                provider,
+                max_concurrency=getattr(settings, f"llm_concurrency_{provider}", 0),
+                tpm=getattr(settings, f"llm_tpm_{provider}", 0),
+                max_queue=settings.llm_max_queue,
+            )
+    return gov
+
+
+class CircuitOpen(Exception):
+    """
+    Raised instead of calling a provider whose circuit is open, or half-open
+    with its one probe call already out; the caller moves down the chain.
+    """
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive errors so the provider is skipped.
+    After reset_s it is half-open: a single probe call goes through (see
+    acquire) while everyone else keeps skipping it, and the probe's outcome
+    closes or re-opens it. failures=0 never opens.
+    """
+
+    def __init__(self, failures=5, reset_s=30.0):
+        self.failures = failures
+        self.reset_s = reset_s
+        self._lock = threading.Lock()
+        self._errors = 0
+        self._opened_at = None
+        # the probe in flight and when it went out; a probe that never
+        # reports back (lost thread, ...) is replaced after reset_s
+        self._probe = None
+        self._probe_at = None
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self._opened_at >= self.reset_s else "open"
+
+    def _probe_free(self, now):
+        return self._probe is None or now - self._probe_at >= self.reset_s
+
+    def available(self):
+        """
+        Worth putting in the chain: closed, or half-open with the probe free.
+        Takes nothing; acquire() decides at call time.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            return now - self._opened_at >= self.reset_s and self._probe_free(now)
+
+    def acquire(self, forced=False):
+        """
+        Right before a call: a token to hand back to release(), or None when
+        the call should skip this provider. Only one caller at a time gets
+        the half-open probe. `forced` (no other provider to skip to) always
+        gets through, as before.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._opened_at is None or forced:
+                return True
+            if now - self._opened_at < self.reset_s or not self._probe_free(now):
+                return None
+            self._probe, self._probe_at = object(), now
+            return self._probe
+
+    def release(self, token):
+        # a probe that ended without record() (cancelled, timed out in the
+        # queue) frees the slot for the next caller
+        with self._lock:
+            if token is self._probe:
+                self._probe = self._probe_at = None
+
+    def record(self, ok):
+        with self._lock:
+            self._probe = self._probe_at = None
+            if ok:
+                self._errors, self._opened_at = 0, None
+                return
+            self._errors += 1
+            if self.failures and (self._errors >= self.failures or self._opened_at is not None):
+                self._opened_at = time.monotonic()
+
+
+class _Admitted:
+    """
+    A breaker's go-ahead for one call, as a (sync or async) context manager
+    around it; raises CircuitOpen when the call should skip the provider.
+    A probe that ends without an outcome is handed back on exit.
+    """
+
+    def __init__(self, provider, forced=False):
+        self.breaker = get_breaker(provider)
+        self.token = self.breaker.acquire(forced)
+        if self.token is None:
+            raise CircuitOpen(f"{provider} circuit is open")
+
+    def __enter__(self):
+        return self.breaker
+
+    def __exit__(self, *exc):
+        self.breaker.release(self.token)
+
+    async def __aenter__(self):
+        return self.breaker
+
+    async def __aexit__(self, *exc):
+        self.breaker.release(self.token)
+
+
+_breakers = {}
+
+
+def get_breaker(provider):
+    with _governors_lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            breaker = _breakers[provider] = CircuitBreaker(settings.llm_breaker_failures, settings.llm_breaker_reset_s)
+    return breaker
+
+
+def provider_chain():
+    """
+    LLM_PROVIDER followed by LLM_FALLBACK_PROVIDERS, minus providers whose
+    circuit is open or whose half-open probe is out. If that leaves none
+    the primary is tried anyway.
+    """
+    names = [settings.llm_provider, *settings.llm_fallback_providers.split(",")]
+    chain = list(dict.fromkeys(p.strip().lower() for p in names if p.strip()))
+    return [p for p in chain if get_breaker(p).available()] or chain[:1]
+
+
+def check_capacity():
+    """
+    Raises LLMOverloaded when no provider in the chain has room in its
+    queue; lets the API fail fast before doing any work for a request.
+    """
+    chain = provider_chain()
+    for provider in chain:
+        if not get_governor(provider).full():
+            return
+    gov = get_governor(chain[0])
+    gov.rejected += 1
+    raise LLMOverloaded(gov.provider, gov.retry_after())
+
+
+def _estimate_tokens(messages):
+    # charged against the TPM bucket up front, corrected once usage is known
+    return sum(len(m.get("content") or "") for m in messages) // 4 + settings.llm_completion_tokens_estimate
+
+
+def _used_tokens(out):
+    usage = telemetry.usage_of(out)
+    return sum(usage) if usage else None
+
+
+def _mock_response(content):
+    delay = _mock_delay(content)
+    if delay > 0:
+        time.sleep(delay)
+    return _content_response(content)
+
+
+async def _amock_response(content):
+    delay = _mock_delay(content)
+    if delay > 0:
+        await asyncio.sleep(delay)
+    return _content_response(content)
+
+
+def _resolve_model(provider=None):
+    """
+    Returns the litellm model string for a provider (default: the configured
+    one), or None when we should answer with a mock response.
+    """
+    provider = (provider or settings.llm_provider).lower()
 
     # mock mode if no key or provider explicitly "mock"
     if provider == "mock" or (provider == "openai" and not settings.openai_api_key):
-        # deterministic mock for local tests
-        return {"choices":[{"message":{"content":"{\"paragraphs\":[\"Mock paragraph 1\",\"Mock paragraph 2\",\"Mock paragraph 3\"],\"whats_new\":[\"Mock new 1\",\"Mock new 2\"],\"open_problems\":[\"Mock open 1\"],\"top5_papers\":[{\"title\":\"Mock\",\"url\":\"http://example.com\"}]}"}}]}
+        return None
 
     if settings.openai_project_id:
         os.environ["OPENAI_PROJECT_ID"] = settings.openai_project_id
 
     if provider == "openai":
-        return litellm.completion(model=settings.openai_model, messages=messages)
+        return settings.openai_model
 
     if provider == "ollama":
-        return litellm.completion(model=f"ollama/{settings.ollama_model}", messages=messages)
+        return f"ollama/{settings.ollama_model}"
+
+    return ""
+
+
+def current_model():
+    """
+    The litellm model string in use, or None for the mock providers.
+    """
+    return _resolve_model() or None
+
+
+def model_name(provider):
+    """
+    What a provider's answers are attributed to: its litellm model string,
+    or the provider name for the mock providers.
+    """
+    return _resolve_model(provider) or provider
+
+
+def _provider_kwargs(provider):
+    # keep the Ollama model loaded between requests instead of its 5 min default;
+    # extra_body, because litellm would put a plain keep_alive into "options"
+    return {"extra_body": {"keep_alive": settings.ollama_keep_alive}} if provider == "ollama" else {}
+
+
+async def awarm_provider(provider):
+    """
+    Imports litellm and loads the tokenizer off the event loop, then sends
+    one tiny completion so the connection is open and (for Ollama) the model
+    is loaded and pinned. Bypasses the cache, governor and breaker. Returns
+    the model warmed, or None for the mock providers.
+    """
+    model = _resolve_model(provider)
+    if not model:
+        return None
+    messages = [{"role": "user", "content": "ping"}]
+    litellm = await asyncio.to_thread(_litellm)
+    await asyncio.to_thread(_count_prompt, model, messages)
+    await litellm.acompletion(
+        model=model, messages=messages, max_tokens=1, timeout=settings.warmup_timeout_s, **_provider_kwargs(provider)
+    )
+    return model
+
+
+def get_llm_cache():
+    global _cache
+    if _cache is None and settings.llm_cache_enabled:
+        _cache = LLMCache(
+            settings.llm_cache_path,
+            ttl_s=settings.llm_cache_ttl_s,
+            max_entries=settings.llm_cache_max_entries,
+        )
+    return _cache
+
+
+def _cache_key(provider, messages, use_cache):
+    model = _resolve_model(provider)
+    if not model or not use_cache or get_llm_cache() is None:
+        return None
+    return make_key(provider, model, messages)
+
+
+def _cache_lookup(chain, messages, use_cache):
+    # an answer from any provider in the chain will do; returns (provider, content)
+    for provider in chain:
+        key = _cache_key(provider, messages, use_cache)
+        if key:
+            cached = get_llm_cache().get(key)
+            _record_cache_lookup(provider, _resolve_model(provider), cached is not None)
+            if cached is not None:
+                return provider, cached
+    return None, None
+
+
+def _first_error(errors):
+    # a provider skipped for its circuit says less than one that actually failed
+    return next((e for e in errors if not isinstance(e, CircuitOpen)), errors[0])
+
+
+def _extract_content(out):
+    try:
+        return out["choices"][0]["message"]["content"]
+    except Exception:
+        return None
+
+
+def _complete(provider, messages, priority, deadline, forced=False):
+    model = _resolve_model(provider)
+    with (
+        _Admitted(provider, forced) as breaker,
+        get_governor(provider).slot(priority, _estimate_tokens(messages), timeout=deadline - time.monotonic()) as slot,
+    ):
+        if not model:
+            # deterministic mock for local tests (fallback mock for unknown providers)
+            content = MOCK_CONTENT if model is None else FALLBACK_CONTENT
+            _record_mock(provider, messages, content, "mock" if model is None else "fallback")
+            return _mock_response(content)
+
+        started = time.perf_counter()
+        try:
+            out = _litellm().completion(
+                model=model, messages=messages, timeout=max(1.0, deadline - time.monotonic()),
+                **_provider_kwargs(provider),
+            )
+        except Exception:
+            _record_error(provider, model)
+            breaker.record(False)
+            raise
+        slot.used = _used_tokens(out)
+        breaker.record(True)
+    _record_call(provider, model, started, out)
+    return out
+
+
+def chat_completion(messages, use_cache=True, priority=PRIORITY_SUMMARY):
+    """
+    Blocking completion. Queue wait plus generation are bounded by
+    LLM_TIMEOUT_S; the provider request is aborted when time runs out.
+    Errors fail over down the provider chain (no hedging here: a losing
+    thread could not be cancelled).
+    """
+    return chat_completion_with_model(messages, use_cache, priority)[0]
+
+
+def chat_completion_with_model(messages, use_cache=True, priority=PRIORITY_SUMMARY):
+    """
+    chat_completion that also returns the model_name of the provider that
+    answered (after a failover it is not the configured one).
+    """
+    deadline = time.monotonic() + settings.llm_timeout_s
+    chain = provider_chain()
+
+    provider, cached = _cache_lookup(chain, messages, use_cache)
+    if cached is not None:
+        return _content_response(cached), model_name(provider)
+
+    errors = []
+    for i, provider in enumerate(chain):
+        if i:
+            telemetry.LLM_FALLBACKS.labels(provider, "failover").inc()
+        try:
+            out = _complete(provider, messages, priority, deadline, forced=len(chain) == 1)
+        except Exception as e:
+            errors.append(e)
+            if time.monotonic() >= deadline:
+                break
+            continue
+        content = _extract_content(out)
+        if content or i == len(chain) - 1:
+            key = _cache_key(provider, messages, use_cache)
+            if key and content:
+                get_llm_cache().put(key, content)
+            return out, model_name(provider)
+        errors.append(ValueError(f"{provider} returned an empty completion"))
+    raise _first_error(errors)
+
+
+async def _acomplete(provider, messages, priority, forced=False):
+    model = _resolve_model(provider)
+    async with (
+        _Admitted(provider, forced) as breaker,
+        get_governor(provider).aslot(priority, _estimate_tokens(messages)) as slot,
+    ):
+        if not model:
+            content = MOCK_CONTENT if model is None else FALLBACK_CONTENT
+            _record_mock(provider, messages, content, "mock" if model is None else "fallback")
+            return await _amock_response(content)
+
+        started = time.perf_counter()
+        try:
+            out = await _litellm().acompletion(
+                model=model, messages=messages, timeout=settings.llm_timeout_s, **_provider_kwargs(provider)
+            )
+        except Exception:
+            _record_error(provider, model)
+            breaker.record(False)
+            raise
+        slot.used = _used_tokens(out)
+        breaker.record(True)
+    _record_call(provider, model, started, out)
+    return out
+
+
+async def _astream(provider, messages, priority, forced=False):
+    # one provider's token stream; the governor slot is held until it ends or is closed
+    model = _resolve_model(provider)
+    async with (
+        _Admitted(provider, forced) as breaker,
+        get_governor(provider).aslot(priority, _estimate_tokens(messages)) as slot,
+    ):
+        if not model:
+            content = MOCK_CONTENT if model is None else FALLBACK_CONTENT
+            _record_mock(provider, messages, content, "mock" if model is None else "fallback")
+            if settings.mock_llm_latency_s > 0:
+                await asyncio.sleep(settings.mock_llm_latency_s)
+            for i in range(0, len(content), 32):
+                if settings.mock_llm_tokens_per_s > 0:
+                    await asyncio.sleep(8 / settings.mock_llm_tokens_per_s)
+                yield content[i:i + 32]
+            return
+
+        parts = []
+        usage = None
+        # OpenAI only reports usage on a stream when asked for it
+        extra = {"stream_options": {"include_usage": True}} if provider == "openai" else {}
+        extra.update(_provider_kwargs(provider))
+        started = time.perf_counter()
+        try:
+            stream = await _litellm().acompletion(
+                model=model, messages=messages, stream=True, timeout=settings.llm_timeout_s, **extra
+            )
+            async for chunk in stream:
+                usage = telemetry.usage_of(chunk) or usage
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except Exception:
+            _record_error(provider, model)
+            breaker.record(False)
+            raise
+        slot.used = sum(usage) if usage else None
+        breaker.record(True)
+
+    if usage is None:
+        content = "".join(parts)
+        usage = (_count_prompt(model, messages), count_tokens(content, model))
+    _record_call(provider, model, started, {"usage": {"prompt_tokens": usage[0], "completion_tokens": usage[1]}})
+
+
+async def _race(chain, run, discard=None):
+    """
+    Runs `run(provider, first)` for chain[0]. The next provider is started
+    too when the newest attempt has not set its `first` event (first token)
+    within LLM_HEDGE_AFTER_S, or as soon as every running attempt has
+    failed. Returns (provider, result) for the first truthy result and
+    cancels the rest; `discard` cleans up results that finished but lost.
+    """
+    loop = asyncio.get_running_loop()
+    attempts, errors = {}, []
+    nxt, first, launched = 0, None, 0.0
+
+    def launch(reason):
+        nonlocal nxt, first, launched
+        provider = chain[nxt]
+        if nxt:
+            telemetry.LLM_FALLBACKS.labels(provider, reason).inc()
+        first, launched = asyncio.Event(), loop.time()
+        attempts[asyncio.ensure_future(run(provider, first))] = provider
+        nxt += 1
+
+    launch(None)
+    winner = None
+    try:
+        while attempts and winner is None:
+            timeout = None
+            if settings.llm_hedge_after_s > 0 and nxt < len(chain) and not first.is_set():
+                timeout = max(0.0, launched + settings.llm_hedge_after_s - loop.time())
+            done, _ = await asyncio.wait(attempts, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                if not first.is_set():
+                    launch("hedge")
+                continue
+            for task in done:
+                provider = attempts.pop(task)
+                if task.exception() is not None:
+                    errors.append(task.exception())
+                elif not task.result():
+                    errors.append(ValueError(f"{provider} returned an empty completion"))
+                elif winner is None:
+                    winner = provider, task.result()
+                elif discard:
+                    await discard(task.result())
+            if winner is None and not attempts and nxt < len(chain):
+                launch("failover")
+    finally:
+        for task in attempts:
+            task.cancel()
+        if attempts:
+            await asyncio.gather(*attempts, return_exceptions=True)
+    if winner is None:
+        raise _first_error(errors)
+    return winner
+
+
+async def achat_completion(messages, use_cache=True, priority=PRIORITY_SUMMARY):
+    """
+    Async twin of chat_completion built on litellm.acompletion, so the
+    event loop is free while the provider is generating. Callers bound it
+    with asyncio.wait_for; cancellation frees the governor slot.
+
+    With fallback providers configured the call is hedged (see _race): the
+    first complete answer wins, so a stalled provider costs at most
+    LLM_HEDGE_AFTER_S.
+    """
+    return (await achat_completion_with_model(messages, use_cache, priority))[0]
+
+
+async def achat_completion_with_model(messages, use_cache=True, priority=PRIORITY_SUMMARY):
+    """
+    achat_completion that also returns the model_name of the provider that
+    answered (a hedge or failover may win).
+    """
+    chain = provider_chain()
+
+    if use_cache and any(_cache_key(p, messages, use_cache) for p in chain):
+        provider, cached = await asyncio.to_thread(_cache_lookup, chain, messages, use_cache)
+        if cached is not None:
+            return _content_response(cached), model_name(provider)
+
+    if len(chain) == 1:
+        provider = chain[0]
+        out = await _acomplete(provider, messages, priority, forced=True)
+        content = _extract_content(out)
+    else:
+        async def collect(provider, first):
+            parts = []
+            async for delta in _astream(provider, messages, priority):
+                first.set()
+                parts.append(delta)
+            return "".join(parts)
+
+        provider, content = await _race(chain, collect)
+        out = _content_response(content)
+
+    key = _cache_key(provider, messages, use_cache)
+    if key and content:
+        await asyncio.to_thread(get_llm_cache().put, key, content)
+    return out, model_name(provider)
+
+
+async def astream_chat_completion(messages, use_cache=True, priority=PRIORITY_SUMMARY):
+    """
+    Yields the completion text as it is generated. Cache hits and mock
+    providers yield in one or a few chunks. With fallback providers the
+    first provider to produce a token is streamed and the others cancelled.
+    """
+    chain = provider_chain()
+
+    if use_cache and any(_cache_key(p, messages, use_cache) for p in chain):
+        _, cached = await asyncio.to_thread(_cache_lookup, chain, messages, use_cache)
+        if cached is not None:
+            yield cached
+            return
+
+    async def first_token(provider, first):
+        stream = _astream(provider, messages, priority, forced=len(chain) == 1)
+        try:
+            delta = await stream.__anext__()
+        except StopAsyncIteration:
+            return None
+        except BaseException:
+            await stream.aclose()
+            raise
+        first.set()
+        return stream, delta
+
+    async def close(result):
+        await result[0].aclose()
+
+    provider, (stream, delta) = await _race(chain, first_token, discard=close)
+    parts = [delta]
+    try:
+        yield delta
+        async for delta in stream:
+            parts.append(delta)
+            yield delta
+    finally:
+        await stream.aclose()
 
-    # fallback mock
-    return {"choices":[{"message":{"content":"{\"paragraphs\":[\"Fallback 1\",\"Fallback 2\",\"Fallback 3\"],\"whats_new\":[\"A\",\"B\"],\"open_problems\":[\"C\"],\"top5_papers\":[{\"title\":\"T\",\"url\":\"U\"}]}"}}]}
+    content = "".join(parts)
+    key = _cache_key(provider, messages, use_cache)
+    if key and content:
+        await asyncio.to_thread(get_llm_cache().put, key, content)
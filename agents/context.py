@@ -0,0 +1,111 @@
+# agents/context.py
+import re
+from typing import Dict, List, Optional, Tuple
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+MAX_AUTHORS = 3
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Token count with the target model's tokenizer; ~4 chars/token when
+    there is no real model (mock provider) or the tokenizer is unavailable.
+    """
+    if model:
+        try:
+            import litellm  # loaded on first use; see agents/_llm._litellm
+
+            return litellm.token_counter(model=model, text=text)
+        except Exception:
+            pass
+    return max(1, len(text) // 4) if text else 0
+
+
+def _authors(authors) -> str:
+    if isinstance(authors, str):
+        return authors
+    authors = list(authors or [])
+    shown = ", ".join(authors[:MAX_AUTHORS])
+    return shown + (" et al." if len(authors) > MAX_AUTHORS else "")
+
+
+def _header(i: int, p: Dict) -> str:
+    return (
+        f"[{i}] {p.get('title','').strip()} ({p.get('year','')})\n"
+        f"AUTHORS: {_authors(p.get('authors'))}\n"
+    )
+
+
+def _compress_abstract(abstract: str, terms: set, budget: int, model: Optional[str]) -> str:
+    """
+    Keeps the abstract sentences that mention the most plan keywords, in their
+    original order, until the token budget for this paper is spent.
+    """
+    sentences = [s for s in _SENTENCE_RE.split(abstract.strip()) if s]
+    if not sentences or budget <= 0:
+        return ""
+
+    costs = [count_tokens(s, model) for s in sentences]
+    if sum(costs) <= budget:
+        return " ".join(sentences)
+
+    def score(idx):
+        words = set(_WORD_RE.findall(sentences[idx].lower()))
+        # prefer keyword hits, then earlier sentences (abstracts lead with the claim)
+        return (len(words & terms), -idx)
+
+    keep, used = [], 0
+    for idx in sorted(range(len(sentences)), key=score, reverse=True):
+        if used + costs[idx] <= budget:
+            keep.append(idx)
+            used += costs[idx]
+
+    if not keep:
+        # even the best sentence is too long: hard-truncate it by characters
+        best = max(range(len(sentences)), key=score)
+        return sentences[best][: budget * 4].rstrip() + "…"
+
+    return " ".join(sentences[i] for i in sorted(keep))
+
+
+def pack_papers(
+    papers: List[Dict],
+    keywords: Optional[List[str]] = None,
+    budget: int = 3000,
+    model: Optional[str] = None,
+    offset: int = 0,
+) -> Tuple[str, int]:
+    """
+    Renders papers as the numbered [N] context block used by the summarizer,
+    fitting it into `budget` tokens. Returns (context, tokens_used).
+    """
+    terms = set()
+    for k in keywords or []:
+        terms.update(_WORD_RE.findall(str(k).lower()))
+
+    headers = [_header(i, p) for i, p in enumerate(papers, start=offset + 1)]
+    footers = [f"URL: {p.get('url','')}" for p in papers]
+    fixed = [count_tokens(f"{h}ABSTRACT: \n{f}", model) + 2 for h, f in zip(headers, footers)]
+
+    # drop trailing papers if even their headers don't fit
+    n = len(papers)
+    while n and sum(fixed[:n]) > budget:
+        n -= 1
+
+    remaining = budget - sum(fixed[:n])
+    abstracts = [""] * n
+    # shortest abstracts first so their unused share flows to longer ones
+    order = sorted(range(n), key=lambda i: len(papers[i].get("abstract") or ""))
+    for pos, i in enumerate(order):
+        share = remaining // (n - pos)
+        text = _compress_abstract(papers[i].get("abstract") or "", terms, share, model)
+        abstracts[i] = text
+        remaining -= count_tokens(text, model)
+
+    blocks = [
+        f"{headers[i]}ABSTRACT: {abstracts[i]}\n{footers[i]}"
+        for i in range(n)
+    ]
+    context = "\n\n".join(blocks)
+    return context, count_tokens(context, model)
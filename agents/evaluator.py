@@ -2,6 +2,8 @@
 import math
 from typing import Dict, List
 
+import numpy as np
+
 
 def _summary_text(summary: Dict) -> str:
     parts = []
@@ -64,3 +66,210 @@ def evaluate_summary(summary: Dict, papers: List[Dict]) -> Dict[str, float]:
         "structure": round(structure, 3),
         "overall": round(overall, 3),
     }
+
+
+# above this many distinct title tokens a summary goes through the word index
+INDEX_MIN_TOKENS = 32
+# summaries per evaluate_batch text buffer
+_CHUNK = 256
+SECTIONS = ["key_findings", "limitations", "future_work", "methods", "whats_new", "open_problems"]
+
+# what str.split() splits on: every code point with str.isspace() (all below U+3001)
+_WHITESPACE = np.array([c for c in range(0x3001) if chr(c).isspace()], dtype=np.uint32)
+
+
+def _title_tokens(paper: Dict) -> List[str]:
+    title = (paper.get("title") or "").lower()
+    return [t for t in title.split() if len(t) > 4][:2]
+
+
+def _joined_lower(texts: List[str]):
+    """
+    " ".join(texts).lower() and where each text starts in it (plus one
+    past the end). Lowercasing each text on its own gives the same string:
+    the space keeps final-sigma rules from looking across texts.
+    """
+    joined = " ".join(texts)
+    if joined.isascii():
+        low = joined.lower()
+    else:
+        # lowercasing can change a text's length, so lower them one by one
+        texts = [t.lower() for t in texts]
+        low = " ".join(texts)
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    return low, np.concatenate(([0], np.cumsum(lengths + 1)))
+
+
+def _is_space(text: str) -> np.ndarray:
+    """
+    Per character of text: is it whitespace to str.split()?
+    """
+    if text.isascii():
+        b = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+        # ASCII whitespace is 9-13 and 28-32 (uint8 wraps below the range)
+        return ((b - np.uint8(9)) < 5) | ((b - np.uint8(28)) < 5)
+    return np.isin(np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32), _WHITESPACE)
+
+
+def _word_spans(text: str):
+    """
+    Start and end offsets of the words str.split() finds in text.
+    """
+    # with a space on both sides, words start and end where `space` flips
+    space = _is_space(text).view(np.int8)
+    edges = np.flatnonzero(np.diff(space, prepend=np.int8(1), append=np.int8(1)))
+    return edges[0::2], edges[1::2]
+
+
+def _round3(col: np.ndarray) -> np.ndarray:
+    # Python's round() (not np.round) so ties resolve exactly like
+    # evaluate_summary; scores repeat a lot, so round each value once
+    uniq, inverse = np.unique(col, return_inverse=True)
+    return np.array([round(float(x), 3) for x in uniq], dtype=np.float64)[inverse.reshape(-1)]
+
+
+def _text_chunk(summaries: List[Dict]):
+    """
+    The lowercased text of each summary (paragraphs first, then its filled
+    list sections) joined into one buffer. Returns the buffer, where each
+    summary's text and paragraphs start and end in it, and how many
+    sections each one filled.
+    """
+    pieces, first_piece, par_end, filled = [], [], [], []
+    for s in summaries:
+        first_piece.append(len(pieces))
+        pieces.extend(s.get("paragraphs", []))
+        par_end.append(len(pieces))
+        f = 0
+        for sec in SECTIONS:
+            val = s.get(sec)
+            if isinstance(val, list) and val:
+                f += 1
+                pieces.extend(val)
+        filled.append(f)
+    first_piece.append(len(pieces))
+    text, offsets = _joined_lower(pieces)
+    first_piece = np.asarray(first_piece, dtype=np.int64)
+    lo = offsets[first_piece[:-1]]
+    hi = np.maximum(offsets[first_piece[1:]] - 1, lo)
+    par_hi = np.maximum(offsets[np.asarray(par_end, dtype=np.int64)] - 1, lo)
+    return text, lo, hi, par_hi, filled
+
+
+def evaluate_batch(summaries: List[Dict], papers_list: List[List[Dict]], as_frame: bool = True):
+    """
+    Scores many summaries at once; summaries[i] is scored against
+    papers_list[i]. Gives the same numbers as evaluate_summary, one row per
+    summary, as a DataFrame (or a dict of NumPy arrays with as_frame=False).
+    """
+    if len(summaries) != len(papers_list):
+        raise ValueError("summaries and papers_list must have the same length")
+    n = len(summaries)
+
+    # papers -> distinct titles -> vocabulary ids of their first two long
+    # words (-1: none), read off word spans of all titles at once
+    n_papers = np.fromiter((len(papers or ()) for papers in papers_list), dtype=np.int64, count=n)
+    paper_titles = [p.get("title") or "" for papers in papers_list for p in papers or ()]
+    title_ids = {t: i for i, t in enumerate(dict.fromkeys(paper_titles))}
+    paper_title = np.fromiter(map(title_ids.__getitem__, paper_titles), dtype=np.int64, count=len(paper_titles))
+    titles, title_offsets = _joined_lower(list(title_ids))
+    starts, ends = _word_spans(titles)
+    long = np.flatnonzero(ends - starts > 4)
+    owner = np.searchsorted(title_offsets, starts[long], side="right") - 1
+    with_tokens, at = np.unique(owner, return_index=True)
+    nxt = np.minimum(at + 1, max(len(long) - 1, 0))
+    second_at = np.where(owner[nxt] == with_tokens, nxt, at) if len(long) else at
+    picked = np.concatenate((long[at], long[second_at]))
+    picked_tokens = [titles[a:b] for a, b in zip(starts[picked].tolist(), ends[picked].tolist())]
+    vocab: Dict[str, int] = {t: i for i, t in enumerate(dict.fromkeys(picked_tokens))}
+    ids = np.fromiter(map(vocab.__getitem__, picked_tokens), dtype=np.int64, count=len(picked))
+    title_first = np.full(len(title_ids), -1, dtype=np.int64)
+    title_second = np.full(len(title_ids), -1, dtype=np.int64)
+    title_first[with_tokens], title_second[with_tokens] = ids[:len(at)], ids[len(at):]
+
+    rows = np.repeat(np.arange(n, dtype=np.int64), n_papers)
+    first, second = title_first[paper_title], title_second[paper_title]
+    has_tokens = first >= 0
+    rows, first, second = rows[has_tokens], first[has_tokens], second[has_tokens]
+
+    # the distinct (summary, token) pairs coverage has to look up
+    v = max(len(vocab), 1)
+    keys = np.unique(np.concatenate((rows * v + first, rows * v + second)))
+    pair_rows, pair_tokens = keys // v, keys % v
+    wanted = np.bincount(pair_rows, minlength=n)
+    bounds = np.searchsorted(pair_rows, np.arange(n + 1)).tolist()
+    tokens = list(vocab)
+    lengths = sorted({len(t) for t in vocab})
+
+    found = np.zeros(len(keys), dtype=bool)
+    filled = np.zeros(n, dtype=np.int64)
+    par_tokens = np.zeros(n, dtype=np.int64)
+    seen = set()
+    containers: Dict[str, List[str]] = {}
+    # summaries go through in chunks: buffers stay small and cache-resident
+    for c0 in range(0, n, _CHUNK):
+        c1 = min(c0 + _CHUNK, n)
+        text, lo, hi, par_hi, filled[c0:c1] = _text_chunk(summaries[c0:c1])
+        lo, hi = lo.tolist(), hi.tolist()
+
+        # 1) coverage: "tok in text" for each pair. Title tokens have no
+        # whitespace, so that holds exactly when some word of the text is,
+        # or contains, tok, and a match never runs across pieces. For a
+        # handful of tokens a substring search is cheapest; summaries scored
+        # against many titles are split into distinct words once and looked
+        # up in a token -> longer words containing it index shared by the
+        # batch.
+        find = text.find
+        for i in range(c0, c1):
+            a, b = bounds[i], bounds[i + 1]
+            if a == b:
+                continue
+            k = i - c0
+            if wanted[i] <= INDEX_MIN_TOKENS:
+                found[a:b] = [find(tokens[t], lo[k], hi[k]) >= 0 for t in pair_tokens[a:b].tolist()]
+                continue
+            words = set(text[lo[k]:hi[k]].split())
+            new = words - seen
+            seen |= new
+            for w in new:
+                for size in lengths:
+                    if size >= len(w):
+                        break
+                    for j in range(len(w) - size + 1):
+                        if w[j:j + size] in vocab:
+                            containers.setdefault(w[j:j + size], []).append(w)
+            found[a:b] = [
+                tok in words or any(w in words for w in containers.get(tok, ()))
+                for tok in map(tokens.__getitem__, pair_tokens[a:b].tolist())
+            ]
+
+        # 2) depth: words starting inside the paragraphs' span (lowercasing
+        # never adds or removes whitespace): non-space characters after a
+        # space or at the very start
+        space = _is_space(text)
+        word_start = ~space
+        word_start[1:] &= space[:-1]
+        par_tokens[c0:c1] = [np.count_nonzero(word_start[a:b]) for a, b in zip(lo, par_hi.tolist())]
+
+    hit = found[np.searchsorted(keys, rows * v + first)] & found[np.searchsorted(keys, rows * v + second)]
+    hits = np.bincount(rows[hit], minlength=n).astype(np.float64)
+    coverage = np.divide(hits, n_papers, out=np.zeros(n), where=n_papers > 0)
+
+    # np.log1p can differ from math.log1p in the last ulp, so use math on
+    # the (few) distinct counts and broadcast back
+    uniq, inverse = np.unique(par_tokens, return_inverse=True)
+    depth = np.array([min(1.0, math.log1p(int(t)) / math.log1p(800)) for t in uniq])[inverse.reshape(-1)]
+
+    # 3) structure
+    structure = filled / len(SECTIONS)
+
+    overall = 0.4 * coverage + 0.3 * depth + 0.3 * structure
+
+    scores = {
+        name: _round3(col)
+        for name, col in (("coverage", coverage), ("depth", depth), ("structure", structure), ("overall", overall))
+    }
+    if not as_frame:
+        return scores
+    import pandas as pd
+    return pd.DataFrame(scores)
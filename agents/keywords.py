@@ -0,0 +1,74 @@
+# agents/keywords.py
+import re
+from typing import List, Tuple
+
+# English function words plus words that are noise in a literature search
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers herself him himself his how i if in into is it its itself just
+me more most my myself no nor not now of off on once only or other our ours ourselves out over own
+same she should so some such than that the their theirs them themselves then there these they this
+those through to too under until up very was we were what when where which while who whom why will
+with would you your yours yourself yourselves via using use used based towards toward vs versus
+paper papers article articles survey surveys review reviews overview study studies research
+recent latest new novel current state art approach approaches method methods technique techniques
+application applications work works trend trends advance advances development developments
+find show tell explain give summarize summary summaries please want looking look need
+""".split())
+
+# words that turn the rest of their phrase into an exclusion
+NEGATIONS = frozenset({"not", "without", "excluding", "except", "exclude", "no"})
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+\-#.]*[a-z0-9+#]|[a-z0-9]")
+_SPLIT_RE = re.compile(r"[,;:!?()\[\]{}\"]|\.\s|\s-\s")
+
+
+def _phrases(text: str) -> List[Tuple[List[str], bool]]:
+    """
+    RAKE candidate phrases: runs of non-stopwords between stopwords and
+    punctuation, each flagged if it follows a negation.
+    """
+    out = []
+    for chunk in _SPLIT_RE.split(text.lower()):
+        current, negated = [], False
+        for tok in _TOKEN_RE.findall(chunk):
+            if tok in NEGATIONS:
+                if current:
+                    out.append((current, negated))
+                current, negated = [], True
+            elif tok in STOPWORDS:
+                if current:
+                    out.append((current, negated))
+                    negated = False
+                current = []
+            else:
+                current.append(tok)
+        if current:
+            out.append((current, negated))
+    return out
+
+
+def rake(text: str):
+    """
+    Rapid Automatic Keyword Extraction. Returns (phrases, excluded): the
+    candidate phrases with their RAKE scores (sum of word degree/frequency),
+    in the order they appear, and the phrases that follow a negation.
+    """
+    candidates = _phrases(text)
+    kept = [words for words, negated in candidates if not negated]
+
+    freq, degree = {}, {}
+    for words in kept:
+        for w in words:
+            freq[w] = freq.get(w, 0) + 1
+            degree[w] = degree.get(w, 0) + len(words)
+
+    phrases, seen = [], set()
+    for words in kept:
+        phrase = " ".join(words)
+        if phrase not in seen:
+            seen.add(phrase)
+            phrases.append((phrase, sum(degree[w] / freq[w] for w in words)))
+    excluded = list(dict.fromkeys(" ".join(words) for words, negated in candidates if negated))
+    return phrases, excluded
@@ -0,0 +1,60 @@
+# agents/pipeline.py
+import time
+
+from agents.planner import aplan_query
+from agents.retriever import afetch_papers
+from agents.summarizer import amake_summary, astream_summary
+from agents.evaluator import evaluate_summary
+from agents.scoring import ascore_summary
+from agents.telemetry import stage
+from agents.tracking import track_summarization_run
+
+
+async def _noop(stage):
+    pass
+
+
+async def _stream_summary(papers, req, plan, on_partial):
+    parts, summary = [], None
+    async for kind, data in astream_summary(papers, use_cache=req.use_cache, keywords=plan.get("keywords")):
+        if kind == "token":
+            parts.append(data)
+            await on_partial("summary_text", "".join(parts))
+        elif kind == "summary":
+            summary = data
+    return summary
+
+
+async def arun_summarization(req, on_stage=None, on_partial=None):
+    """
+    The full plan -> retrieve -> summarize -> evaluate pipeline for one
+    SummarizeReq. `on_stage(name)` is awaited as each stage starts.
+    With `on_partial(key, value)` the plan and papers are reported as soon
+    as they are known and the summary is streamed ("summary_text" grows
+    token by token). Returns a SummarizeResp-shaped dict.
+    """
+    on_stage = on_stage or _noop
+    t0 = time.perf_counter()
+
+    await on_stage("planning")
+    with stage("plan"):
+        plan = await aplan_query(req.query, req.date_range, use_cache=req.use_cache, mode=req.planner)
+    if on_partial:
+        await on_partial("plan", plan)
+    await on_stage("retrieving")
+    with stage("retrieve"):
+        papers = await afetch_papers(plan, n=req.n_papers, sources=req.sources)
+    if on_partial:
+        await on_partial("papers", papers)
+    await on_stage("summarizing")
+    with stage("summarize"):
+        if on_partial:
+            summary = await _stream_summary(papers, req, plan, on_partial)
+        else:
+            summary = await amake_summary(papers, use_cache=req.use_cache, keywords=plan.get("keywords"))
+    await on_stage("evaluating")
+    with stage("evaluate"):
+        scores = {**evaluate_summary(summary, papers), **await ascore_summary(summary, papers)}
+    track_summarization_run(req.model_dump(), plan, papers, summary, scores, time.perf_counter() - t0)
+
+    return {"plan": plan, "papers": papers, "summary": summary, "eval": scores}
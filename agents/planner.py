@@ -1,9 +1,15 @@
 
+import asyncio
+import copy
 import json
+from functools import lru_cache
 from config.settings import settings
-from agents._llm import chat_completion
+from agents._llm import PRIORITY_PLAN, chat_completion, achat_completion
+from agents.keywords import rake
 
-def plan_query(query: str, date_range=None):
+MAX_KEYWORDS = 8
+
+def _plan_messages(query: str, date_range=None):
     date_hint = date_range.dict() if getattr(date_range, "dict", None) else None
     prompt = f'''
 You are a research planning assistant.
@@ -17,13 +23,56 @@ Date hint: {date_hint}
 Return ONLY JSON.
 '''.strip()
 
-    out = chat_completion([
+    return [
         {"role":"system","content":"You are a research planner."},
         {"role":"user","content":prompt}
-    ])
+    ]
+
+def _parse_plan(query: str, out):
     content = out["choices"][0]["message"]["content"]
     try:
         return json.loads(content)
     except Exception:
         # safe default
         return {"keywords": query.split(), "include": [], "exclude": [], "date_window": None}
+
+def _date_window(date_range):
+    start = getattr(date_range, "start", None)
+    end = getattr(date_range, "end", None)
+    return f"{start or '..'}/{end or '..'}" if (start or end) else None
+
+@lru_cache(maxsize=settings.plan_cache_size)
+def _local_plan(query: str, date_window):
+    phrases, excluded = rake(query)
+    # keep query order: the keywords are joined into the arXiv search string
+    keywords = [p for p, _ in phrases][:MAX_KEYWORDS] or query.split()[:MAX_KEYWORDS]
+    ranked = sorted(phrases, key=lambda ps: -ps[1])
+    include = [p for p, _ in ranked if " " in p][:4] or [p for p, _ in ranked][:2]
+    return {"keywords": keywords, "include": include, "exclude": excluded[:3], "date_window": date_window}
+
+def local_plan(query: str, date_range=None):
+    """
+    LLM-free plan in the same shape as the LLM planner's: RAKE keyword
+    extraction over the query, memoized by normalized query.
+    """
+    normalized = " ".join(query.lower().split())
+    return copy.deepcopy(_local_plan(normalized, _date_window(date_range)))
+
+def _planner_mode(mode):
+    return (mode or settings.planner_mode).lower()
+
+def plan_query(query: str, date_range=None, use_cache=True, mode=None):
+    if _planner_mode(mode) == "local":
+        return local_plan(query, date_range)
+    out = chat_completion(_plan_messages(query, date_range), use_cache=use_cache, priority=PRIORITY_PLAN)
+    return _parse_plan(query, out)
+
+async def aplan_query(query: str, date_range=None, use_cache=True, mode=None):
+    if _planner_mode(mode) == "local":
+        return local_plan(query, date_range)
+    # bounds the governor queue wait too, like the sync path's deadline
+    out = await asyncio.wait_for(
+        achat_completion(_plan_messages(query, date_range), use_cache=use_cache, priority=PRIORITY_PLAN),
+        timeout=settings.llm_timeout_s,
+    )
+    return _parse_plan(query, out)
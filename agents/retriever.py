@@ -1,15 +1,93 @@
 
-from typing import Dict, List
-from retrieval.arxiv_client import search_arxiv
+import asyncio
+from typing import Dict, List, Tuple
+from config.settings import settings
+from retrieval.arxiv_client import search_arxiv, asearch_arxiv, OFFLINE_URL
+from retrieval.local_index import search_local, index_in_background
 from retrieval.normalize import dedupe
 
-def fetch_papers(plan: Dict, n: int = 8, sources: List[str] = ["arxiv"]):
+def _plan_to_query(plan: Dict) -> str:
     q_terms = plan.get("keywords") or []
-    query = " ".join(q_terms) if q_terms else plan.get("raw", "")
+    return " ".join(q_terms) if q_terms else plan.get("raw", "")
+
+def _remember(papers):
+    # grow the offline corpus with everything we fetched live
+    index_in_background([p for p in papers if p.get("url") != OFFLINE_URL])
+
+def fetch_papers(plan: Dict, n: int = 8, sources: List[str] = ["arxiv"]):
+    query = _plan_to_query(plan)
     papers = []
 
+    if "local" in sources:
+        papers += search_local(query, max_results=n)
+
     if "arxiv" in sources:
-        papers += search_arxiv(query, max_results=max(n*2, 12))
+        fetched = search_arxiv(query, max_results=max(n*2, 12))
+        _remember(fetched)
+        papers += fetched
 
     papers = dedupe(papers)
     return papers[:n]
+
+async def afetch_papers(plan: Dict, n: int = 8, sources: List[str] = ["arxiv"]):
+    query = _plan_to_query(plan)
+    papers = []
+
+    if "local" in sources:
+        papers += await asyncio.to_thread(search_local, query, n)
+
+    if "arxiv" in sources:
+        fetched = await asearch_arxiv(query, max_results=max(n*2, 12))
+        _remember(fetched)
+        papers += fetched
+
+    papers = dedupe(papers)
+    return papers[:n]
+
+async def afetch_papers_batch(requests: List[Tuple[Dict, int, List[str]]]):
+    """
+    afetch_papers for many (plan, n, sources) at once. Each distinct query is
+    searched once per source with the largest n any request needs, and the
+    requests take their slice of the shared results. Returns one list of
+    papers (or the exception raised for it) per request.
+    """
+    wants = {}
+    for plan, n, sources in requests:
+        query = _plan_to_query(plan)
+        for source in ("local", "arxiv"):
+            if source in sources:
+                need = n if source == "local" else max(n*2, 12)
+                wants[(source, query)] = max(wants.get((source, query), 0), need)
+
+    # don't open one arXiv connection per topic at once
+    limit = asyncio.Semaphore(settings.harvest_concurrency)
+
+    async def run(source, query, need):
+        if source == "local":
+            return await asyncio.to_thread(search_local, query, need)
+        async with limit:
+            return await asearch_arxiv(query, max_results=need)
+
+    keys = list(wants)
+    results = await asyncio.gather(*(run(s, q, wants[(s, q)]) for s, q in keys), return_exceptions=True)
+    shared = dict(zip(keys, results))
+    _remember([p for (s, _), r in shared.items() if s == "arxiv" and isinstance(r, list) for p in r])
+
+    out = []
+    for plan, n, sources in requests:
+        query = _plan_to_query(plan)
+        papers = []
+        try:
+            if "local" in sources:
+                papers += _take(shared[("local", query)], n)
+            if "arxiv" in sources:
+                papers += _take(shared[("arxiv", query)], max(n*2, 12))
+            out.append(dedupe(papers)[:n])
+        except Exception as e:
+            out.append(e)
+    return out
+
+def _take(result, k):
+    if isinstance(result, BaseException):
+        raise result
+    return result[:k]
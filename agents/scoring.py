@@ -0,0 +1,237 @@
+# agents/scoring.py
+import asyncio
+import multiprocessing
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List
+
+import numpy as np
+
+from config.settings import settings
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_CITE_RE = re.compile(r"\[#?(\d+)\]")
+EMPTY_SCORES = {"rougeL": None, "bertscore_f1": None, "citation_grounding": None}
+
+# per-process state: the encoder stays loaded for the life of the worker
+_model = None
+_model_lock = threading.Lock()
+_abstract_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_cache_lock = threading.Lock()
+_pool = None
+
+
+# ---------- ROUGE-L ----------
+def _rouge_tokens(text: str) -> List[str]:
+    # same tokenization as rouge_score's default tokenizer (no stemming)
+    return _NON_ALNUM_RE.sub(" ", (text or "").lower()).split()
+
+
+def _lcs_length(a: List[str], b: List[str]) -> int:
+    """
+    Bit-parallel LCS (Allison-Dix): one big-int update per token of `a`
+    instead of a len(a) x len(b) table in Python.
+    """
+    if not a or not b:
+        return 0
+    masks = {}
+    for i, tok in enumerate(b):
+        masks[tok] = masks.get(tok, 0) | (1 << i)
+    full = (1 << len(b)) - 1
+    v = full
+    for tok in a:
+        m = masks.get(tok)
+        if m:
+            u = v & m
+            v = ((v + u) | (v - u)) & full
+    return len(b) - bin(v).count("1")
+
+
+def rouge_l(summary_text: str, abstracts: List[str]) -> float:
+    """
+    ROUGE-L F1 of the summary against each abstract, averaged over papers.
+    """
+    cand = _rouge_tokens(summary_text)
+    scores = []
+    for abstract in abstracts:
+        ref = _rouge_tokens(abstract)
+        lcs = _lcs_length(cand, ref)
+        if not lcs:
+            scores.append(0.0)
+            continue
+        p, r = lcs / len(cand), lcs / len(ref)
+        scores.append(2 * p * r / (p + r))
+    return sum(scores) / len(scores) if scores else 0.0
+
+
+# ---------- embeddings ----------
+def _get_model():
+    global _model
+    with _model_lock:
+        if _model is None:
+            from sentence_transformers import SentenceTransformer
+            _model = SentenceTransformer(settings.embedding_model, device="cpu")
+    return _model
+
+
+def _encode(sentences: List[str]) -> np.ndarray:
+    vecs = _get_model().encode(
+        sentences, batch_size=64, normalize_embeddings=True, convert_to_numpy=True, show_progress_bar=False
+    )
+    return np.asarray(vecs, dtype=np.float32)
+
+
+def _sentences(text: str) -> List[str]:
+    return [s for s in _SENTENCE_RE.split((text or "").strip()) if s]
+
+
+def _abstract_vectors(papers: List[Dict]) -> List[np.ndarray]:
+    """
+    Sentence embeddings of each abstract. Abstracts are cached by URL, and
+    the ones not cached yet are encoded together in one batch.
+    """
+    keys = [p.get("url") or p.get("title") or "" for p in papers]
+    with _cache_lock:
+        todo = {}
+        for key, p in zip(keys, papers):
+            if key not in _abstract_cache and key not in todo:
+                todo[key] = _sentences(p.get("abstract") or "") or [p.get("title") or ""]
+
+        if todo:
+            flat = [s for sents in todo.values() for s in sents]
+            vecs = _encode(flat)
+            start = 0
+            for key, sents in todo.items():
+                _abstract_cache[key] = vecs[start:start + len(sents)]
+                start += len(sents)
+
+        out = []
+        for key in keys:
+            _abstract_cache.move_to_end(key)
+            out.append(_abstract_cache[key])
+        while len(_abstract_cache) > settings.eval_cache_size:
+            _abstract_cache.popitem(last=False)
+    return out
+
+
+def _claims(summary: Dict) -> List[str]:
+    claims = [s for p in summary.get("paragraphs", []) for s in _sentences(p)]
+    for sec in ("key_findings", "limitations", "future_work", "methods", "whats_new", "open_problems"):
+        vals = summary.get(sec) or []
+        if isinstance(vals, list):
+            claims.extend(str(v) for v in vals if v)
+    return claims
+
+
+# ---------- public API ----------
+def score_summary(summary: Dict, papers: List[Dict]) -> Dict[str, float]:
+    """
+    Reference-based metrics against the retrieved abstracts.
+
+    - rougeL: ROUGE-L F1 of the paragraphs vs. each abstract, averaged
+    - bertscore_f1: greedy-matched sentence embedding similarity (summary
+      sentences vs. abstract sentences), BERTScore-style P/R/F1
+    - citation_grounding: fraction of summary claims whose best match in the
+      cited papers (all papers if none are cited) clears the threshold
+    """
+    if not summary or not papers:
+        return dict(EMPTY_SCORES)
+
+    abstracts = [p.get("abstract") or "" for p in papers]
+    scores = {**EMPTY_SCORES, "rougeL": round(rouge_l(" ".join(summary.get("paragraphs", [])), abstracts), 3)}
+
+    claims = _claims(summary)
+    if not claims:
+        return scores
+    try:
+        per_paper = _abstract_vectors(papers)
+        claim_vecs = _encode(claims)
+    except Exception:
+        # no embedding model available: only the lexical metric
+        return scores
+
+    ref = np.concatenate(per_paper)
+    sim = claim_vecs @ ref.T
+    precision = float(sim.max(axis=1).mean())
+    recall = float(sim.max(axis=0).mean())
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0.0
+
+    bounds = np.cumsum([0] + [len(v) for v in per_paper])
+    grounded = 0
+    for i, claim in enumerate(claims):
+        cited = [int(n) - 1 for n in _CITE_RE.findall(claim) if 0 < int(n) <= len(papers)]
+        if cited:
+            best = max(float(sim[i, bounds[c]:bounds[c + 1]].max()) for c in cited)
+        else:
+            best = float(sim[i].max())
+        grounded += best >= settings.grounding_threshold
+
+    scores["bertscore_f1"] = round(f1, 3)
+    scores["citation_grounding"] = round(grounded / len(claims), 3)
+    return scores
+
+
+def _warm():
+    try:
+        _get_model()
+        return True
+    except Exception:
+        return False
+
+
+def get_scoring_pool():
+    """
+    Worker processes that keep the encoder warm. Spawned (not forked) so
+    they don't inherit the API's event loop and torch thread state.
+    """
+    global _pool
+    if _pool is None and settings.eval_workers > 0:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.eval_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm,
+        )
+    return _pool
+
+
+async def awarm_scoring():
+    """
+    Loads the encoder wherever scores are computed: in each worker process,
+    or in this process when EVAL_WORKERS=0. True if it loaded.
+    """
+    pool = get_scoring_pool()
+    if pool is None:
+        return await asyncio.to_thread(_warm)
+    loaded = await asyncio.gather(*(asyncio.wrap_future(pool.submit(_warm)) for _ in range(settings.eval_workers)))
+    return all(loaded)
+
+
+async def ascore_summary(summary: Dict, papers: List[Dict]) -> Dict[str, float]:
+    """
+    score_summary off the event loop: in the worker pool, or in a thread
+    when EVAL_WORKERS=0. Failures degrade to empty scores.
+    """
+    if not settings.eval_model_metrics:
+        return dict(EMPTY_SCORES)
+    try:
+        pool = get_scoring_pool()
+        if pool is None:
+            return await asyncio.to_thread(score_summary, summary, papers)
+        return await asyncio.get_running_loop().run_in_executor(pool, score_summary, summary, papers)
+    except BrokenProcessPool:
+        # a worker died; start a fresh pool on the next call
+        shutdown_scoring()
+        return dict(EMPTY_SCORES)
+    except Exception:
+        return dict(EMPTY_SCORES)
+
+
+def shutdown_scoring():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -1,44 +1,43 @@
 # agents/summarizer.py
+import asyncio
 import json
 import re
 import concurrent.futures
-from agents._llm import chat_completion
+from config.settings import settings
+from agents._llm import (
+    PRIORITY_DIGEST,
+    PRIORITY_SUMMARY,
+    LLMOverloaded,
+    achat_completion,
+    achat_completion_with_model,
+    astream_chat_completion,
+    chat_completion,
+    chat_completion_with_model,
+    current_model,
+    model_name,
+    provider_chain,
+)
+from agents import telemetry
+from agents._digest_cache import DigestCache, digest_key
+from agents.context import count_tokens, pack_papers
 
+LLM_TIMEOUT_S = settings.llm_timeout_s
 
-def make_summary(papers):
-    """
-    Generate a deep, structured summary over all papers.
-    Returns a dict matching SummaryOut.
-    """
+# shared by every sync map step; the LLM governor bounds what reaches the provider
+_map_pool = concurrent.futures.ThreadPoolExecutor(max_workers=settings.map_concurrency, thread_name_prefix="digest")
 
-    # Build paper context
-    numbered = []
-    for i, p in enumerate(papers[:10], start=1):
-        numbered.append(
-            f"[{i}] {p.get('title','').strip()} "
-            f"({p.get('year','')})\n"
-            f"AUTHORS: {p.get('authors','')}\n"
-            f"ABSTRACT: {(p.get('abstract','') or '').strip()}\n"
-            f"URL: {p.get('url','')}"
-        )
+_digest_cache = None
 
-    context = "\n\n".join(numbered) if numbered else "No papers available."
+SYSTEM_PROMPT = (
+    "You are an expert scientific reviewer. "
+    "You write deep, technically precise summaries for graduate-level readers."
+)
 
-    # LLM prompt
-    messages = [
-        {
-            "role": "system",
-            "content": (
-                "You are an expert scientific reviewer. "
-                "You write deep, technically precise summaries for graduate-level readers."
-            ),
-        },
-        {
-            "role": "user",
-            "content": f"""
-You are given several research papers (each labeled [#N]).
+# instructions and JSON schema shared by every prompt that writes the final summary
+SUMMARY_TEMPLATE = """
+{intro}
 
-Write a **deep, structured literature summary** across ALL papers.
+Write a **deep, structured literature summary** across ALL {scope}.
 
 1. First, write 3–5 dense paragraphs that:
    - synthesize the main ideas,
@@ -52,7 +51,7 @@ Write a **deep, structured literature summary** across ALL papers.
    - methods: 3–6 study/algorithm patterns.
    - whats_new: 3–5 novel contributions.
    - open_problems: 3–5 unresolved research questions.
-   - top5_papers: title + url.
+   - top5_papers: {top5}
 
 Return **ONLY valid JSON** with this structure:
 
@@ -67,33 +66,219 @@ Return **ONLY valid JSON** with this structure:
   "top5_papers": []
 }}
 
+{label}:
+{context}
+""".strip()
+
+
+def _final_messages(intro, context, scope="of them", top5="title + url.", label="PAPERS"):
+    content = SUMMARY_TEMPLATE.format(intro=intro, scope=scope, top5=top5, label=label, context=context)
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": content},
+    ]
+
+
+def _summary_messages(papers, keywords=None):
+    # Build paper context, packed into the configured token budget
+    context, tokens = pack_papers(
+        papers[:settings.summary_single_max],
+        keywords,
+        budget=settings.summary_context_tokens,
+        model=current_model(),
+    )
+    context = context or "No papers available."
+
+    messages = _final_messages(
+        "You are given several research papers (each labeled [#N]).", context, scope="papers"
+    )
+    return messages, tokens
+
+def _digest_messages(papers, offset, keywords=None):
+    """
+    Map step: condense a small group of papers into a compact JSON digest.
+    Papers keep their global [N] labels so citations survive the reduce.
+    """
+    context, tokens = pack_papers(
+        papers,
+        keywords,
+        budget=settings.summary_context_tokens,
+        model=current_model(),
+        offset=offset,
+    )
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": f"""
+Digest the research papers below (each labeled [#N]) for a later literature review.
+Be terse and technical; cite papers as [N].
+
+Return **ONLY valid JSON**:
+
+{{
+  "synthesis": "one dense paragraph",
+  "key_findings": [],
+  "methods": [],
+  "limitations": [],
+  "future_work": [],
+  "whats_new": [],
+  "open_problems": [],
+  "notable_papers": [{{"title": "", "url": ""}}]
+}}
+
 PAPERS:
 {context}
+""".strip(),
+        },
+    ], tokens
+
+
+def _merge_messages(digests):
+    """
+    Intermediate reduce: fold several digests into one digest of the same shape.
+    """
+    blob = "\n\n".join(json.dumps(d, ensure_ascii=False) for d in digests)
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": f"""
+Merge the partial literature digests below into ONE digest. Deduplicate,
+keep [N] citations, keep the most important items, and keep at most
+5 notable_papers.
+
+Return **ONLY valid JSON** with the same keys as the inputs:
+synthesis, key_findings, methods, limitations, future_work, whats_new,
+open_problems, notable_papers.
+
+DIGESTS:
+{blob}
 """.strip(),
         },
     ]
 
-    # LLM call with timeout
-    try:
-        with concurrent.futures.ThreadPoolExecutor() as ex:
-            future = ex.submit(chat_completion, messages)
-            out = future.result(timeout=120)
 
-        content = out["choices"][0]["message"]["content"]
+def _reduce_messages(digests, n_papers):
+    blob = "\n\n".join(json.dumps(d, ensure_ascii=False) for d in digests)
+    return _final_messages(
+        f"You are given digests of {n_papers} research papers (cited as [N]).",
+        blob,
+        top5="title + url, chosen from notable_papers.",
+        label="DIGESTS",
+    )
 
-    except Exception as e:
-        return {
-            "paragraphs": [f"Model error: {e}"],
-            "key_findings": [],
-            "limitations": [],
-            "future_work": [],
-            "methods": [],
-            "whats_new": [],
-            "open_problems": [],
-            "top5_papers": [],
+def _paper_digest_messages(numbered):
+    """
+    Map step for per-paper digests: several unseen papers in one call, each
+    digested on its own and without the query's keywords, so the result can
+    be cached per paper and reused by any topic.
+    """
+    model = current_model()
+    budget = settings.summary_context_tokens // max(1, len(numbered))
+    blocks, tokens = [], 0
+    for n, p in numbered:
+        block, used = pack_papers([p], budget=budget, model=model, offset=n - 1)
+        blocks.append(block)
+        tokens += used
+    context = "\n\n".join(blocks)
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": f"""
+Digest EACH research paper below (labeled [N]) on its own, for reuse in later
+literature reviews. Be terse and technical; 1–3 short items per list.
+
+Return **ONLY valid JSON** with one entry per paper:
+
+{{
+  "papers": [
+    {{"n": N, "contribution": "one sentence", "findings": [], "methods": [], "limitations": []}}
+  ]
+}}
+
+PAPERS:
+{context}
+""".strip(),
+        },
+    ], tokens
+
+
+def _parse_paper_digests(content):
+    # {N: digest} for the entries that came back well-formed
+    digests = {}
+    for entry in _loads_json(content).get("papers") or []:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            n = int(entry.get("n"))
+        except (TypeError, ValueError):
+            continue
+
+        def items(key):
+            v = entry.get(key)
+            return [str(x) for x in v if x][:3] if isinstance(v, list) else []
+
+        digests[n] = {
+            "contribution": str(entry.get("contribution") or "").strip(),
+            "findings": items("findings"),
+            "methods": items("methods"),
+            "limitations": items("limitations"),
         }
+    return digests
 
-    # Try parsing JSON
+
+def _fallback_digest(p):
+    # no usable model digest (mock provider, malformed reply); never cached
+    abstract = " ".join((p.get("abstract") or "").split())
+    first = re.split(r"(?<=[.!?])\s+", abstract, maxsplit=1)[0]
+    return {"contribution": first[:400], "findings": [], "methods": [], "limitations": []}
+
+
+def _paper_reduce_messages(papers, digests):
+    """
+    Final synthesis from per-paper digests: a few lines per paper instead of
+    its abstract. Papers past the context budget are listed by title only.
+    """
+    model = current_model()
+    lines, used = [], 0
+    for n, (p, d) in enumerate(zip(papers, digests), start=1):
+        head = f"[{n}] {(p.get('title') or '').strip()} ({p.get('year', '')}) {p.get('url', '')}"
+        line = f"{head}\n{json.dumps(d, ensure_ascii=False)}"
+        cost = count_tokens(line, model)
+        if used + cost > settings.summary_context_tokens:
+            line, cost = head, count_tokens(head, model)
+        lines.append(line)
+        used += cost
+    blob = "\n\n".join(lines)
+
+    return _final_messages(f"You are given per-paper digests of {len(papers)} research papers (cited as [N]).", blob)
+
+def _use_paper_digests(papers, use_cache=True):
+    mode = settings.summary_mode.lower()
+    if not papers or mode in ("single", "map_reduce"):
+        return False
+    # auto: one call per few papers only pays off when the digests are reused
+    return mode == "digest" or (use_cache and get_digest_cache() is not None)
+
+
+def _use_map_reduce(papers):
+    mode = settings.summary_mode.lower()
+    if mode == "map_reduce":
+        return True
+    if mode == "single":
+        return False
+    return len(papers) > settings.summary_single_max
+
+
+def _groups(items, size):
+    return [(i, items[i:i + size]) for i in range(0, len(items), size)]
+
+
+def _loads_json(content):
     try:
         parsed = json.loads(content)
         if isinstance(parsed, list):
@@ -101,6 +286,192 @@ PAPERS:
     except:
         match = re.search(r"\{.*\}", content, re.S)
         parsed = json.loads(match.group(0)) if match else {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def _usable_digests(replies):
+    digests = [d for d in (_loads_json(r[0]) for r in replies if isinstance(r, tuple)) if d]
+    if not digests:
+        errors = [r for r in replies if isinstance(r, Exception)]
+        raise errors[0] if errors else ValueError("empty digests")
+    return digests
+
+
+def _map_reduce_steps(papers, keywords=None):
+    """
+    Map + intermediate reduce rounds. Returns a short list of digests (at
+    most summary_reduce_fanin) for the final reduce and the number of
+    paper-context tokens sent in the map step.
+    """
+    mapped = [
+        _digest_messages(group, offset, keywords) for offset, group in _groups(papers, settings.map_group_size)
+    ]
+    digests = _usable_digests((yield [m for m, _ in mapped]))
+    fanin = max(2, settings.summary_reduce_fanin)
+    while len(digests) > fanin:
+        digests = _usable_digests((yield [_merge_messages(group) for _, group in _groups(digests, fanin)]))
+    return digests, sum(t for _, t in mapped)
+
+
+def get_digest_cache():
+    global _digest_cache
+    if _digest_cache is None and settings.digest_cache_enabled:
+        _digest_cache = DigestCache(settings.digest_cache_path, max_entries=settings.digest_cache_max_entries)
+    return _digest_cache
+
+
+def _plan_paper_digests(papers, use_cache):
+    """
+    Looks up cached per-paper digests. Returns (digests by index, map calls)
+    where each call is (indices, messages, tokens) covering only the papers
+    not found.
+    """
+    cache = get_digest_cache() if use_cache else None
+    digests = {}
+    if cache:
+        # a digest from any model in the provider chain will do
+        models = [model_name(p) for p in provider_chain()]
+        keys = [[digest_key(p, m) for m in models] for p in papers]
+        found = cache.get_many([k for ks in keys for k in ks])
+        for i, ks in enumerate(keys):
+            hit = next((found[k] for k in ks if k in found), None)
+            telemetry.record_cache("digest", "miss" if hit is None else "hit")
+            if hit is not None:
+                digests[i] = hit
+
+    missing = [i for i in range(len(papers)) if i not in digests]
+    calls = []
+    for _, group in _groups(missing, settings.map_group_size):
+        messages, tokens = _paper_digest_messages([(i + 1, papers[i]) for i in group])
+        calls.append((group, messages, tokens))
+    return digests, calls
+
+
+def _finish_paper_digests(papers, use_cache, digests, calls, replies):
+    # replies[i] is (text, model that answered), or the exception, of calls[i]
+    if calls and all(isinstance(r, Exception) for r in replies):
+        raise replies[0]
+
+    fresh = {}
+    for (group, _, _), reply in zip(calls, replies):
+        content, model = reply if isinstance(reply, tuple) else (None, None)
+        parsed = _parse_paper_digests(content) if content else {}
+        for i in group:
+            if parsed.get(i + 1):
+                # keyed on who wrote it: a fallback's digest is not the primary's
+                digests[i] = fresh[digest_key(papers[i], model)] = parsed[i + 1]
+            else:
+                digests[i] = _fallback_digest(papers[i])
+
+    cache = get_digest_cache() if use_cache else None
+    if cache and fresh:
+        cache.put_many(fresh)
+    return [digests[i] for i in range(len(papers))], sum(t for _, _, t in calls)
+
+
+def _paper_digest_steps(papers, use_cache=True):
+    """
+    One digest per paper, in paper order, plus the paper-context tokens sent
+    to the model. Only papers without a cached digest cost an LLM call.
+    """
+    digests, calls = _plan_paper_digests(papers, use_cache)
+    replies = yield [m for _, m, _ in calls]
+    return _finish_paper_digests(papers, use_cache, digests, calls, replies)
+
+
+def _summary_steps(papers, use_cache=True, keywords=None):
+    """
+    The summarizer's LLM rounds before the final call, written once for the
+    sync and async drivers: each `yield` hands over a batch of prompts and
+    receives their replies ((text, model that answered), or the exception
+    raised). Returns the
+    final messages, the context tokens and the digests (None for a single
+    call).
+    """
+    if _use_paper_digests(papers, use_cache):
+        digests, tokens = yield from _paper_digest_steps(papers, use_cache)
+        return _paper_reduce_messages(papers, digests), tokens, digests
+    if _use_map_reduce(papers):
+        digests, tokens = yield from _map_reduce_steps(papers, keywords)
+        return _reduce_messages(digests, len(papers)), tokens, digests
+    messages, tokens = _summary_messages(papers, keywords)
+    return messages, tokens, None
+
+
+def _advance(steps, replies=None):
+    # (next batch, None) while there are rounds left, then (None, result)
+    try:
+        return (next(steps) if replies is None else steps.send(replies)), None
+    except StopIteration as done:
+        return None, done.value
+
+
+def _raise_overloaded(replies):
+    # backpressure is the caller's to report (503), not a degraded summary
+    for r in replies:
+        if isinstance(r, LLMOverloaded):
+            raise r
+
+
+def _run_steps(steps, use_cache=True):
+    def run(messages):
+        # chat_completion enforces LLM_TIMEOUT_S itself
+        out, model = chat_completion_with_model(messages, use_cache, priority=PRIORITY_DIGEST)
+        return out["choices"][0]["message"]["content"], model
+
+    def outcome(future):
+        try:
+            return future.result()
+        except Exception as e:
+            return e
+
+    batch, result = _advance(steps)
+    while batch is not None:
+        replies = [outcome(f) for f in [_map_pool.submit(run, m) for m in batch]]
+        _raise_overloaded(replies)
+        batch, result = _advance(steps, replies)
+    return result
+
+
+async def _arun_steps(steps, use_cache=True):
+    """
+    Async driver with bounded concurrency; the steps themselves run in a
+    thread since they read and write the digest cache.
+    """
+    sem = asyncio.Semaphore(settings.map_concurrency)
+
+    async def run(messages):
+        async with sem:
+            out, model = await asyncio.wait_for(
+                achat_completion_with_model(messages, use_cache=use_cache, priority=PRIORITY_DIGEST),
+                timeout=LLM_TIMEOUT_S,
+            )
+        return out["choices"][0]["message"]["content"], model
+
+    batch, result = await asyncio.to_thread(_advance, steps)
+    while batch is not None:
+        replies = await asyncio.gather(*(run(m) for m in batch), return_exceptions=True)
+        _raise_overloaded(replies)
+        batch, result = await asyncio.to_thread(_advance, steps, replies)
+    return result
+
+
+def _error_summary(e):
+    return {
+        "paragraphs": [f"Model error: {e}"],
+        "key_findings": [],
+        "limitations": [],
+        "future_work": [],
+        "methods": [],
+        "whats_new": [],
+        "open_problems": [],
+        "top5_papers": [],
+    }
+
+
+def _parse_summary(content):
+    # Try parsing JSON
+    parsed = _loads_json(content)
 
     # Safe extraction helper
     def safe_list(key):
@@ -117,3 +488,93 @@ PAPERS:
         "open_problems": safe_list("open_problems"),
         "top5_papers": parsed.get("top5_papers") or [],
     }
+
+
+def make_summary(papers, use_cache=True, keywords=None):
+    """
+    Generate a deep, structured summary over all papers.
+    Returns a dict matching SummaryOut.
+
+    By default the summary is built from per-paper digests (findings,
+    methods, limitations) cached across topics, so only papers never seen
+    before cost an LLM call. Without the digest cache, large paper sets go
+    through map-reduce: groups of papers are digested in parallel, then the
+    digests are merged into the final summary.
+
+    `keywords` (from the plan) steer which abstract sentences survive context
+    packing; the paper-context token count is reported as context_tokens.
+    """
+    # LLM call with timeout (enforced by chat_completion)
+    try:
+        messages, tokens, _ = _run_steps(_summary_steps(papers, use_cache, keywords), use_cache)
+        out = chat_completion(messages, use_cache, priority=PRIORITY_SUMMARY)
+        content = out["choices"][0]["message"]["content"]
+
+    except LLMOverloaded:
+        # backpressure is the caller's to report (503), not a summary
+        raise
+    except Exception as e:
+        return _error_summary(e)
+
+    return {**_parse_summary(content), "context_tokens": tokens}
+
+
+async def amake_summary(papers, use_cache=True, keywords=None):
+    """
+    Async variant of make_summary; the timeout cancels the pending completion
+    instead of leaving a worker thread behind.
+    """
+    try:
+        messages, tokens, _ = await _arun_steps(_summary_steps(papers, use_cache, keywords), use_cache)
+        out = await asyncio.wait_for(
+            achat_completion(messages, use_cache=use_cache, priority=PRIORITY_SUMMARY), timeout=LLM_TIMEOUT_S
+        )
+        content = out["choices"][0]["message"]["content"]
+
+    except LLMOverloaded:
+        raise
+    except Exception as e:
+        return _error_summary(e)
+
+    return {**_parse_summary(content), "context_tokens": tokens}
+
+
+async def astream_summary(papers, use_cache=True, keywords=None):
+    """
+    Streams ("token", text) events while the model generates, then a final
+    ("summary", dict) event with the parsed SummaryOut-shaped result.
+    In digest and map-reduce modes a ("progress", ...) event precedes the
+    final tokens.
+    """
+    try:
+        messages, tokens, digests = await _arun_steps(_summary_steps(papers, use_cache, keywords), use_cache)
+    except Exception as e:
+        yield "summary", _error_summary(e)
+        return
+    if digests is not None:
+        yield "progress", {"stage": "digested", "papers": len(papers), "digests": len(digests)}
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + LLM_TIMEOUT_S
+    parts = []
+
+    stream = astream_chat_completion(messages, use_cache=use_cache, priority=PRIORITY_SUMMARY)
+    try:
+        while True:
+            try:
+                delta = await asyncio.wait_for(stream.__anext__(), timeout=deadline - loop.time())
+            except StopAsyncIteration:
+                break
+            parts.append(delta)
+            yield "token", delta
+    except Exception as e:
+        yield "summary", _error_summary(e)
+        return
+    finally:
+        await stream.aclose()
+
+    try:
+        summary = {**_parse_summary("".join(parts)), "context_tokens": tokens}
+    except Exception as e:
+        summary = _error_summary(e)
+    yield "summary", summary
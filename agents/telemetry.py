@@ -0,0 +1,158 @@
+# agents/telemetry.py
+import time
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# LLM-bound stages run for seconds to minutes
+_SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+STAGE_SECONDS = Histogram(
+    "summarizer_stage_seconds", "Duration of one pipeline stage", ["stage"], buckets=_SLOW_BUCKETS
+)
+HTTP_SECONDS = Histogram(
+    "summarizer_http_request_seconds", "HTTP request duration", ["method", "route", "status"],
+    buckets=_SLOW_BUCKETS,
+)
+LLM_SECONDS = Histogram(
+    "summarizer_llm_request_seconds", "LLM completion latency (provider calls only)", ["provider", "model"],
+    buckets=_SLOW_BUCKETS,
+)
+LLM_REQUESTS = Counter(
+    "summarizer_llm_requests_total", "LLM completions by outcome (ok, error, cache_hit, mock)",
+    ["provider", "model", "outcome"],
+)
+LLM_TOKENS = Counter(
+    "summarizer_llm_tokens_total", "LLM tokens used, from the provider's usage field when present",
+    ["provider", "model", "kind"],
+)
+LLM_FALLBACKS = Counter(
+    "summarizer_llm_fallbacks_total", "Calls sent to a later provider in the chain (hedge or failover)",
+    ["provider", "reason"],
+)
+ARXIV_SECONDS = Histogram("summarizer_arxiv_fetch_seconds", "arXiv API request latency")
+ARXIV_ERRORS = Counter("summarizer_arxiv_fetch_errors_total", "Failed arXiv API requests", ["reason"])
+CACHE_REQUESTS = Counter(
+    "summarizer_cache_requests_total", "Cache lookups by result (hit, stale, miss)", ["cache", "result"]
+)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Times a block into summarizer_stage_seconds{stage=name}.
+    """
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(name).observe(time.perf_counter() - t)
+
+
+def record_usage(provider: str, model: str, prompt_tokens, completion_tokens):
+    if prompt_tokens:
+        LLM_TOKENS.labels(provider, model, "prompt").inc(prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.labels(provider, model, "completion").inc(completion_tokens)
+
+
+def usage_of(out):
+    """
+    (prompt_tokens, completion_tokens) from a litellm response or stream
+    chunk, or None when it carries no usage.
+    """
+    usage = getattr(out, "usage", None)
+    if usage is None and isinstance(out, dict):
+        usage = out.get("usage")
+    if not usage:
+        return None
+    get = usage.get if isinstance(usage, dict) else lambda k: getattr(usage, k, None)
+    return get("prompt_tokens") or 0, get("completion_tokens") or 0
+
+
+def record_cache(cache: str, result: str):
+    CACHE_REQUESTS.labels(cache, result).inc()
+
+
+class _StatsCollector:
+    """
+    Counters that already live elsewhere (plan LRU, request coalescing, LLM
+    governor, MLflow writer), read at scrape time so the hot path pays nothing.
+    """
+
+    @staticmethod
+    def _families():
+        plan = CounterMetricFamily(
+            "summarizer_plan_cache_requests", "Local planner LRU lookups", labels=["result"]
+        )
+        flight = CounterMetricFamily(
+            "summarizer_singleflight_calls", "/summarize calls by whether they ran or joined a run",
+            labels=["result"],
+        )
+        queued = GaugeMetricFamily("summarizer_llm_queue_depth", "LLM calls waiting for a slot", labels=["provider"])
+        active = GaugeMetricFamily("summarizer_llm_in_flight", "LLM calls holding a slot", labels=["provider"])
+        rejected = CounterMetricFamily(
+            "summarizer_llm_rejected", "LLM calls refused because the queue was full", labels=["provider"]
+        )
+        circuit = GaugeMetricFamily(
+            "summarizer_llm_circuit_open", "1 while a provider's circuit breaker is open", labels=["provider"]
+        )
+        tracked = CounterMetricFamily(
+            "summarizer_tracking_runs", "MLflow runs by outcome (logged, dropped on a full queue, failed)",
+            labels=["result"],
+        )
+        tracking_queue = GaugeMetricFamily("summarizer_tracking_queue_depth", "MLflow runs waiting to be written")
+        return plan, flight, queued, active, rejected, circuit, tracked, tracking_queue
+
+    def describe(self):
+        # lets the registry check names without importing the modules below
+        return self._families()
+
+    def collect(self):
+        from agents._llm import _breakers, _governors
+        from agents.planner import _local_plan
+        from agents.tracking import tracking_stats
+
+        plan, flight, queued, active, rejected, circuit, tracked, tracking_queue = self._families()
+        for provider, gov in list(_governors.items()):
+            queued.add_metric([provider], gov.queued)
+            active.add_metric([provider], gov.active)
+            rejected.add_metric([provider], gov.rejected)
+        yield queued
+        yield active
+        yield rejected
+        for provider, breaker in list(_breakers.items()):
+            circuit.add_metric([provider], 1 if breaker.state == "open" else 0)
+        yield circuit
+
+        info = _local_plan.cache_info()
+        plan.add_metric(["hit"], info.hits)
+        plan.add_metric(["miss"], info.misses)
+        yield plan
+
+        stats = tracking_stats()
+        for result in ("logged", "dropped", "failed"):
+            tracked.add_metric([result], stats[result])
+        tracking_queue.add_metric([], stats["queued"])
+        yield tracked
+        yield tracking_queue
+
+        try:
+            from api.routers.summarize import _summarize_flight
+        except ImportError:
+            return
+        stats = _summarize_flight.stats()
+        flight.add_metric(["executed"], stats["executions"])
+        flight.add_metric(["coalesced"], stats["coalesced"])
+        yield flight
+
+
+REGISTRY.register(_StatsCollector())
+
+
+def render_metrics():
+    """
+    (body, content_type) for a Prometheus scrape.
+    """
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -1,13 +1,35 @@
 # agents/tracking.py
 import json
+import queue
+import threading
+import time
 from typing import Dict, List
 
-import mlflow
 from config.settings import settings
 
-# local file-based tracking
-mlflow.set_tracking_uri("file:./mlruns")
-mlflow.set_experiment("auto-research-summarizer")
+EXPERIMENT_NAME = "auto-research-summarizer"
+_STOP = object()
+
+_queue = queue.Queue(maxsize=settings.tracking_queue_size)
+_writer = None
+_writer_lock = threading.Lock()
+_client = None
+_experiment_id = None
+_stats = {"logged": 0, "dropped": 0, "failed": 0}
+
+
+def _get_client():
+    global _client, _experiment_id
+    if _client is None:
+        import mlflow
+        from mlflow.tracking import MlflowClient
+
+        # local file-based tracking
+        mlflow.set_tracking_uri(settings.mlflow_tracking_uri)
+        _client = MlflowClient(tracking_uri=settings.mlflow_tracking_uri)
+        exp = _client.get_experiment_by_name(EXPERIMENT_NAME)
+        _experiment_id = exp.experiment_id if exp else _client.create_experiment(EXPERIMENT_NAME)
+    return _client
 
 
 def log_summarization_run(
@@ -17,30 +39,113 @@ def log_summarization_run(
     summary: Dict,
     eval_scores: Dict,
     latency_s: float,
+    started_at: float | None = None,
 ) -> None:
     """
-    Logs one summarization run to MLflow.
+    Logs one summarization run to MLflow: one log_batch call for params and
+    metrics, then the JSON artifacts.
     """
-    with mlflow.start_run(run_name=req.get("query", "")[:50]):
-        # params
-        mlflow.log_param("query", req.get("query"))
-        mlflow.log_param("n_papers", req.get("n_papers"))
-        mlflow.log_param("sources", ",".join(req.get("sources", [])))
-        mlflow.log_param("llm_provider", settings.llm_provider)
-        mlflow.log_param("model", getattr(settings, "openai_model", None) or getattr(settings, "ollama_model", None))
-
-        # metrics
+    from mlflow.entities import Metric, Param, RunStatus
+
+    client = _get_client()
+    ts = int((started_at or time.time()) * 1000)
+    run = client.create_run(_experiment_id, start_time=ts, run_name=req.get("query", "")[:50])
+    run_id = run.info.run_id
+    try:
+        params = {
+            "query": req.get("query"),
+            "n_papers": req.get("n_papers"),
+            "sources": ",".join(req.get("sources", [])),
+            "llm_provider": settings.llm_provider,
+            "model": getattr(settings, "openai_model", None) or getattr(settings, "ollama_model", None),
+        }
+        metrics = {}
         for k, v in (eval_scores or {}).items():
             try:
-                mlflow.log_metric(k, float(v))
-            except Exception:
+                metrics[k] = float(v)
+            except (TypeError, ValueError):
                 pass
-        mlflow.log_metric("latency_s", float(latency_s))
-        mlflow.log_metric("num_papers", len(papers))
-        mlflow.log_metric("num_paragraphs", len(summary.get("paragraphs", [])))
+        metrics["latency_s"] = float(latency_s)
+        metrics["num_papers"] = len(papers)
+        metrics["num_paragraphs"] = len(summary.get("paragraphs", []))
+
+        client.log_batch(
+            run_id,
+            metrics=[Metric(k, v, ts, 0) for k, v in metrics.items()],
+            params=[Param(k, str(v)[:500]) for k, v in params.items()],
+        )
 
         # artifacts (JSON blobs)
-        mlflow.log_text(json.dumps(plan, indent=2), "plan.json")
-        mlflow.log_text(json.dumps(papers, indent=2), "papers.json")
-        mlflow.log_text(json.dumps(summary, indent=2), "summary.json")
-        mlflow.log_text(json.dumps(eval_scores, indent=2), "eval_scores.json")
+        client.log_text(run_id, json.dumps(plan), "plan.json")
+        client.log_text(run_id, json.dumps(papers), "papers.json")
+        client.log_text(run_id, json.dumps(summary), "summary.json")
+        client.log_text(run_id, json.dumps(eval_scores), "eval_scores.json")
+        client.set_terminated(run_id, RunStatus.to_string(RunStatus.FINISHED))
+    except Exception:
+        client.set_terminated(run_id, RunStatus.to_string(RunStatus.FAILED))
+        raise
+
+
+def _write_loop():
+    while True:
+        item = _queue.get()
+        if item is _STOP:
+            return
+        try:
+            log_summarization_run(**item)
+            _stats["logged"] += 1
+        except Exception:
+            _stats["failed"] += 1
+
+
+def _ensure_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_write_loop, name="mlflow-writer", daemon=True)
+            _writer.start()
+
+
+def track_summarization_run(req, plan, papers, summary, eval_scores, latency_s) -> bool:
+    """
+    Queues a run for the background MLflow writer and returns immediately.
+    When the queue is full the run is dropped (and counted) rather than
+    slowing the request down. Returns whether it was queued.
+    """
+    if not settings.tracking_enabled:
+        return False
+    _ensure_writer()
+    try:
+        _queue.put_nowait({
+            "req": req,
+            "plan": plan,
+            "papers": papers,
+            "summary": summary,
+            "eval_scores": eval_scores,
+            "latency_s": latency_s,
+            "started_at": time.time() - latency_s,
+        })
+        return True
+    except queue.Full:
+        _stats["dropped"] += 1
+        return False
+
+
+def flush_tracking(timeout: float = 30.0) -> None:
+    """
+    Lets the writer finish what is queued, then stops it (on shutdown).
+    """
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is None or not writer.is_alive():
+        return
+    try:
+        _queue.put(_STOP, timeout=timeout)
+    except queue.Full:
+        return
+    writer.join(timeout)
+
+
+def tracking_stats() -> Dict[str, int]:
+    return {**_stats, "queued": _queue.qsize()}
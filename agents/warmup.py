@@ -0,0 +1,79 @@
+# agents/warmup.py
+import asyncio
+import time
+
+from config.settings import settings
+from agents._llm import awarm_provider, provider_chain
+from agents.scoring import awarm_scoring
+from retrieval.local_index import get_local_index
+
+_state = {"ready": False, "started_at": None, "finished_at": None, "steps": {}}
+
+
+async def _step(name, coro):
+    t = time.perf_counter()
+    step = _state["steps"][name] = {"ok": None}
+    try:
+        detail = await coro
+        step.update(ok=True, detail=detail)
+    except asyncio.CancelledError:
+        step.update(ok=False, error="timed out")
+        raise
+    except Exception as e:
+        step.update(ok=False, error=str(e) or type(e).__name__)
+    finally:
+        step["seconds"] = round(time.perf_counter() - t, 3)
+
+
+def _warm_embeddings():
+    # even an empty index needs the model: every live fetch is embedded into it
+    get_local_index().warm()
+    return settings.embedding_model
+
+
+async def _warm_scoring():
+    if not await awarm_scoring():
+        raise RuntimeError("scoring model did not load; model-based metrics will be empty")
+    return "loaded"
+
+
+async def warm_up():
+    """
+    Pays the first request's one-off costs up front, concurrently: each
+    provider in the chain (litellm import, tokenizer, Ollama model load),
+    the scoring encoder and the local-index embedding model. Readiness
+    waits for the configured provider (LLM_PROVIDER), whose warm-up is
+    retried every WARMUP_RETRY_S until it succeeds; other failed steps are
+    reported by readiness() but do not hold it back.
+    """
+    _state["started_at"] = time.time()
+    if settings.warmup_enabled:
+        primary = settings.llm_provider.lower()
+        steps = [_step(f"llm:{p}", awarm_provider(p)) for p in provider_chain()]
+        if settings.eval_model_metrics:
+            steps.append(_step("scoring", _warm_scoring()))
+        if settings.local_index_enabled:
+            steps.append(_step("embeddings", asyncio.to_thread(_warm_embeddings)))
+        try:
+            await asyncio.wait_for(asyncio.gather(*steps), timeout=settings.warmup_timeout_s)
+        except asyncio.TimeoutError:
+            pass
+
+        while not _state["steps"].get(f"llm:{primary}", {}).get("ok"):
+            await asyncio.sleep(settings.warmup_retry_s)
+            try:
+                await asyncio.wait_for(
+                    _step(f"llm:{primary}", awarm_provider(primary)), timeout=settings.warmup_timeout_s
+                )
+            except asyncio.TimeoutError:
+                pass
+    _state["finished_at"] = time.time()
+    _state["ready"] = True
+
+
+def readiness():
+    return {
+        "ready": _state["ready"],
+        "warmup_s": round(_state["finished_at"] - _state["started_at"], 3) if _state["finished_at"] else None,
+        "steps": {name: dict(step) for name, step in _state["steps"].items()},
+    }
@@ -1,6 +1,104 @@
 
-from fastapi import FastAPI
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from api.routers.summarize import router as summarize_router
+from api.routers.jobs import router as jobs_router
+from agents import telemetry
+from agents._llm import LLMOverloaded
+from agents.scoring import shutdown_scoring
+from agents.tracking import flush_tracking
+from agents.warmup import readiness, warm_up
+from jobs.worker import start_workers, stop_workers
+from config.settings import settings
+from retrieval.arxiv_client import aclose_client
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # provider + model warm-up runs after startup; GET /ready turns green when it is done
+    warmup = asyncio.create_task(warm_up())
+    # embedded job workers; run `python -m jobs.worker` instead to scale them separately
+    workers = start_workers(settings.job_workers) if settings.job_workers > 0 else None
+    yield
+    warmup.cancel()
+    if workers:
+        await asyncio.to_thread(stop_workers, *workers)
+    shutdown_scoring()
+    # write out runs still queued for MLflow
+    await asyncio.to_thread(flush_tracking)
+    # release pooled upstream connections
+    await aclose_client()
+
+app = FastAPI(title="Automated Research Summarization API", lifespan=lifespan)
+
+def _route_label(request: Request) -> str:
+    # one series per route template (/api/jobs/{job_id}), not per URL
+    route = request.scope.get("route")
+    if getattr(route, "path", None) is None:
+        return "unmatched"
+    # newer FastAPI keeps an included router's own path ("/jobs/{job_id}");
+    # put back the static prefix it was included under
+    path = request.scope["path"]
+    for i, ch in enumerate(path):
+        if ch == "/" and route.path_regex.match(path[i:]):
+            return path[:i] + route.path
+    return route.path
+
+def _observe(request: Request, status: int, started: float):
+    telemetry.HTTP_SECONDS.labels(request.method, _route_label(request), str(status)).observe(
+        time.perf_counter() - started
+    )
+
+@app.exception_handler(LLMOverloaded)
+async def llm_overloaded(request: Request, exc: LLMOverloaded):
+    # backpressure: clients should back off rather than pile onto the queue
+    return JSONResponse(
+        {"detail": str(exc)}, status_code=503, headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    t = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except BaseException:
+        _observe(request, 500, t)
+        raise
+    if not response.headers.get("content-type", "").startswith("text/event-stream"):
+        _observe(request, response.status_code, t)
+        return response
+
+    # SSE: time the whole stream, not just until the headers went out
+    body = response.body_iterator
+
+    async def timed_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            _observe(request, response.status_code, t)
+
+    response.body_iterator = timed_body()
+    return response
+
+@app.get("/health", include_in_schema=False)
+def health():
+    # liveness: the process is up and serving
+    return {"status": "ok"}
+
+@app.get("/ready", include_in_schema=False)
+def ready():
+    # readiness: 503 until the startup warm-up has finished
+    state = readiness()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = telemetry.render_metrics()
+    return Response(body, media_type=content_type)
 
-app = FastAPI(title="Automated Research Summarization API")
 app.include_router(summarize_router, prefix="/api", tags=["summarize"])
+app.include_router(jobs_router, prefix="/api", tags=["jobs"])
@@ -0,0 +1,27 @@
+
+import asyncio
+
+from fastapi import APIRouter, HTTPException
+from api.schemas import JobCreated, JobOut, SummarizeReq
+from jobs.worker import get_job_store
+
+router = APIRouter()
+
+@router.post("/jobs", response_model=JobCreated, status_code=202)
+async def create_job(req: SummarizeReq):
+    """
+    Queues a summarization and returns at once; poll GET /jobs/{id}.
+    """
+    if not req.query.strip():
+        raise HTTPException(status_code=400, detail="Query cannot be empty")
+
+    job_id = await asyncio.to_thread(get_job_store().submit, req.model_dump())
+    return {"job_id": job_id, "status": "queued"}
+
+
+@router.get("/jobs/{job_id}", response_model=JobOut)
+async def get_job(job_id: str):
+    job = await asyncio.to_thread(get_job_store().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,21 +1,172 @@
 
+import asyncio
+import json
+import time
+
 from fastapi import APIRouter, HTTPException
-from api.schemas import SummarizeReq, SummarizeResp
-from agents.planner import plan_query
-from agents.retriever import fetch_papers
-from agents.summarizer import make_summary
+from fastapi.responses import StreamingResponse
+from api.schemas import SummarizeBatchReq, SummarizeBatchResp, SummarizeReq, SummarizeResp
+from agents._llm import check_capacity
+from agents.pipeline import arun_summarization
+from api.singleflight import SingleFlight, request_key
+from agents.planner import aplan_query
+from agents.retriever import afetch_papers, afetch_papers_batch
+from agents.summarizer import amake_summary, astream_summary
 from agents.evaluator import evaluate_summary
+from agents.scoring import ascore_summary
+from agents.telemetry import stage
+from agents.tracking import track_summarization_run
 
 router = APIRouter()
+# identical /summarize requests in flight share one pipeline run
+_summarize_flight = SingleFlight()
 
 @router.post("/summarize", response_model=SummarizeResp)
-def summarize(req: SummarizeReq):
+async def summarize(req: SummarizeReq):
     if not req.query.strip():
         raise HTTPException(status_code=400, detail="Query cannot be empty")
 
-    plan = plan_query(req.query, req.date_range)
-    papers = fetch_papers(plan, n=req.n_papers, sources=req.sources)
-    summary = make_summary(papers)
-    scores = evaluate_summary(summary, papers)
+    return await _summarize_flight.do(request_key(req), lambda: _run(req))
+
+
+async def _run(req: SummarizeReq):
+    # a full LLM queue answers 503 now instead of after planning and retrieval
+    check_capacity()
+    return await arun_summarization(req)
+
+
+@router.get("/summarize/stats")
+async def summarize_stats():
+    """
+    Request coalescing counters: coalescing_ratio is the share of
+    /summarize calls that reused a run already in flight.
+    """
+    return {"singleflight": _summarize_flight.stats()}
+
+
+def _shared(tasks, key, make):
+    # one task per distinct key; items asking for the same work await it together
+    if key not in tasks:
+        tasks[key] = asyncio.ensure_future(make())
+    return tasks[key]
+
+
+@router.post("/summarize/batch", response_model=SummarizeBatchResp)
+async def summarize_batch(batch: SummarizeBatchReq):
+    """
+    Summarizes many topics in one call. Identical plans, arXiv/local queries
+    and paper sets are computed once for the whole batch, and at most
+    `max_concurrency` items make LLM calls at a time. Each item reports its
+    own result or error.
+    """
+    check_capacity()
+    t0 = time.perf_counter()
+    items = batch.items
+    llm_slots = asyncio.Semaphore(batch.max_concurrency)
+
+    async def limited(coro):
+        async with llm_slots:
+            return await coro
+
+    # 1) plans, one per distinct (query, date_range, use_cache)
+    plan_tasks = {}
+    plan_futs = []
+    for req in items:
+        key = (
+            req.query.strip(),
+            json.dumps(req.date_range.model_dump() if req.date_range else None),
+            req.use_cache,
+            req.planner,
+        )
+        plan_futs.append(_shared(
+            plan_tasks, key,
+            lambda req=req: limited(aplan_query(req.query, req.date_range, use_cache=req.use_cache, mode=req.planner)),
+        ))
+    with stage("batch_plan"):
+        plans = await asyncio.gather(*plan_futs, return_exceptions=True)
+
+    # 2) retrieval: each distinct query hits each source once
+    planned = [i for i, plan in enumerate(plans) if not isinstance(plan, BaseException)]
+    with stage("batch_retrieve"):
+        fetched = await afetch_papers_batch([(plans[i], items[i].n_papers, items[i].sources) for i in planned])
+    papers_of = dict(zip(planned, fetched))
+
+    # 3) summaries, one per distinct (papers, keywords, use_cache)
+    summary_tasks = {}
+
+    async def run_item(i, req):
+        plan, papers = plans[i], papers_of.get(i)
+        if isinstance(plan, BaseException):
+            raise plan
+        if isinstance(papers, BaseException):
+            raise papers
+        keywords = plan.get("keywords")
+        key = (tuple(p.get("url") or p.get("title", "") for p in papers), json.dumps(keywords), req.use_cache)
+        summary = await _shared(
+            summary_tasks, key,
+            lambda: limited(amake_summary(papers, use_cache=req.use_cache, keywords=keywords)),
+        )
+        scores = {**evaluate_summary(summary, papers), **await ascore_summary(summary, papers)}
+        track_summarization_run(req.model_dump(), plan, papers, summary, scores, time.perf_counter() - t0)
+        return {"plan": plan, "papers": papers, "summary": summary, "eval": scores}
+
+    with stage("batch_summarize"):
+        outcomes = await asyncio.gather(*(run_item(i, req) for i, req in enumerate(items)), return_exceptions=True)
+
+    results = []
+    for i, (req, out) in enumerate(zip(items, outcomes)):
+        if isinstance(out, BaseException):
+            results.append({"index": i, "query": req.query, "ok": False, "error": str(out) or type(out).__name__})
+        else:
+            results.append({"index": i, "query": req.query, "ok": True, "result": out})
+    succeeded = sum(r["ok"] for r in results)
+    return {"results": results, "succeeded": succeeded, "failed": len(results) - succeeded}
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _summarize_events(req: SummarizeReq):
+    t0 = time.perf_counter()
+    try:
+        with stage("plan"):
+            plan = await aplan_query(req.query, req.date_range, use_cache=req.use_cache, mode=req.planner)
+        yield _sse("plan", plan)
+
+        with stage("retrieve"):
+            papers = await afetch_papers(plan, n=req.n_papers, sources=req.sources)
+        yield _sse("papers", papers)
+
+        summary = None
+        with stage("summarize"):
+            async for kind, data in astream_summary(papers, use_cache=req.use_cache, keywords=plan.get("keywords")):
+                if kind == "summary":
+                    summary = data
+                yield _sse(kind, data)
+
+        with stage("evaluate"):
+            scores = {**evaluate_summary(summary, papers), **await ascore_summary(summary, papers)}
+        yield _sse("eval", scores)
+        track_summarization_run(req.model_dump(), plan, papers, summary, scores, time.perf_counter() - t0)
+        yield _sse("done", {})
+    except Exception as e:
+        yield _sse("error", {"detail": str(e)})
+
+
+@router.post("/summarize/stream")
+async def summarize_stream(req: SummarizeReq):
+    """
+    Same pipeline as /summarize, delivered as Server-Sent Events:
+    plan -> papers -> token* -> summary -> eval -> done.
+    """
+    if not req.query.strip():
+        raise HTTPException(status_code=400, detail="Query cannot be empty")
+    # reject before the 200 goes out; later errors can only be SSE events
+    check_capacity()
 
-    return {"plan": plan, "papers": papers, "summary": summary, "eval": scores}
+    return StreamingResponse(
+        _summarize_events(req),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
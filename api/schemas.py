@@ -1,6 +1,6 @@
 
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from typing import List, Literal, Optional, Dict
 
 class DateRange(BaseModel):
     start: Optional[str] = None  # YYYY-MM-DD
@@ -10,7 +10,9 @@ class SummarizeReq(BaseModel):
     query: str = Field(..., min_length=3)
     n_papers: int = 8
     date_range: Optional[DateRange] = None
-    sources: List[str] = ["arxiv"]
+    sources: List[str] = ["arxiv"]  # "arxiv" (live) and/or "local" (offline corpus)
+    use_cache: bool = True  # set False to bypass the LLM response cache
+    planner: Optional[Literal["llm", "local"]] = None  # default: PLANNER_MODE
 
 class Paper(BaseModel):
     title: str
@@ -25,8 +27,13 @@ class SummaryOut(BaseModel):
     whats_new: List[str]
     open_problems: List[str]
     top5_papers: List[Dict[str, str]]
+    context_tokens: int | None = None
 
 class EvalOut(BaseModel):
+    coverage: float | None = None
+    depth: float | None = None
+    structure: float | None = None
+    overall: float | None = None
     rougeL: float | None = None
     bertscore_f1: float | None = None
     citation_grounding: float | None = None
@@ -36,3 +43,35 @@ class SummarizeResp(BaseModel):
     papers: List[Paper]
     summary: SummaryOut
     eval: EvalOut | None = None
+
+class SummarizeBatchReq(BaseModel):
+    items: List[SummarizeReq] = Field(..., min_length=1, max_length=100)
+    max_concurrency: int = Field(4, ge=1, le=32)  # LLM-bound items in flight
+
+class SummarizeBatchItem(BaseModel):
+    index: int
+    query: str
+    ok: bool
+    result: SummarizeResp | None = None
+    error: str | None = None
+
+class SummarizeBatchResp(BaseModel):
+    results: List[SummarizeBatchItem]
+    succeeded: int
+    failed: int
+
+class JobCreated(BaseModel):
+    job_id: str
+    status: str
+
+class JobOut(BaseModel):
+    id: str
+    status: str  # queued | running | done | failed
+    progress: str | None = None  # current stage while running
+    partial: dict | None = None  # plan / papers / summary_text known so far while running
+    attempts: int = 0
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: SummarizeResp | None = None
+    error: str | None = None
@@ -0,0 +1,52 @@
+
+import asyncio
+import json
+
+
+class SingleFlight:
+    """
+    Runs one execution per key at a time: callers that arrive while a call
+    for the same key is in flight await that call's result instead of
+    starting their own.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.calls = 0
+        self.executions = 0
+
+    async def do(self, key, fn):
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # a caller that disconnects must not cancel the run the others wait on
+        return await asyncio.shield(task)
+
+    def stats(self):
+        coalesced = self.calls - self.executions
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": coalesced,
+            "coalescing_ratio": round(coalesced / self.calls, 3) if self.calls else 0.0,
+            "in_flight": len(self._inflight),
+        }
+
+
+def request_key(req) -> str:
+    """
+    Requests that differ only in query case/whitespace or source order are
+    the same request.
+    """
+    return json.dumps({
+        "query": " ".join(req.query.lower().split()),
+        "n_papers": req.n_papers,
+        "date_range": req.date_range.model_dump() if req.date_range else None,
+        "sources": sorted(set(req.sources)),
+        "use_cache": req.use_cache,
+        "planner": req.planner,
+    }, sort_keys=True)
@@ -11,7 +11,102 @@ class Settings(BaseModel):
     openai_project_id: str | None = os.getenv("OPENAI_PROJECT_ID") 
     openai_model: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
     ollama_model: str = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
+    ollama_keep_alive: str = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # "-1" = until Ollama restarts
     host: str = os.getenv("HOST", "0.0.0.0")
     port: int = int(os.getenv("PORT", "8000"))
 
+    # simulated provider speed for LLM_PROVIDER=mock (benchmarks)
+    mock_llm_latency_s: float = float(os.getenv("MOCK_LLM_LATENCY_S", "0"))
+    mock_llm_tokens_per_s: float = float(os.getenv("MOCK_LLM_TOKENS_PER_S", "0"))
+
+    # on-disk LLM response cache
+    llm_cache_enabled: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    llm_cache_path: str = os.getenv("LLM_CACHE_PATH", "./.cache/llm_cache.sqlite")
+    llm_cache_ttl_s: float = float(os.getenv("LLM_CACHE_TTL_S", str(7 * 24 * 3600)))
+    llm_cache_max_entries: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+    # summarizer: "auto" builds from per-paper digests when the digest cache is on,
+    # else switches to map-reduce above summary_single_max papers; also
+    # "single", "map_reduce" and "digest"
+    summary_mode: str = os.getenv("SUMMARY_MODE", "auto")
+    summary_single_max: int = int(os.getenv("SUMMARY_SINGLE_MAX", "10"))
+    map_group_size: int = int(os.getenv("MAP_GROUP_SIZE", "4"))
+    map_concurrency: int = int(os.getenv("MAP_CONCURRENCY", "4"))
+    summary_reduce_fanin: int = int(os.getenv("SUMMARY_REDUCE_FANIN", "8"))
+    # token budget for the paper context of each summarizer prompt
+    summary_context_tokens: int = int(os.getenv("SUMMARY_CONTEXT_TOKENS", "3000"))
+
+    # per-paper digests, shared across topics (keyed by paper, model and prompt version)
+    digest_cache_enabled: bool = os.getenv("DIGEST_CACHE_ENABLED", "true").lower() == "true"
+    digest_cache_path: str = os.getenv("DIGEST_CACHE_PATH", "./.cache/paper_digests.sqlite")
+    digest_cache_max_entries: int = int(os.getenv("DIGEST_CACHE_MAX_ENTRIES", "200000"))
+
+    # local embedding corpus ("local" source)
+    local_index_enabled: bool = os.getenv("LOCAL_INDEX_ENABLED", "true").lower() == "true"
+    local_index_dir: str = os.getenv("LOCAL_INDEX_DIR", "./.cache/local_index")
+    local_index_exact_max: int = int(os.getenv("LOCAL_INDEX_EXACT_MAX", "50000"))
+    embedding_model: str = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+    # arXiv upstream + query result cache
+    arxiv_api_url: str = os.getenv("ARXIV_API_URL", "http://export.arxiv.org/api/query")
+    arxiv_cache_enabled: bool = os.getenv("ARXIV_CACHE_ENABLED", "true").lower() == "true"
+    arxiv_cache_path: str = os.getenv("ARXIV_CACHE_PATH", "./.cache/arxiv_cache.sqlite")
+    arxiv_cache_ttl_s: float = float(os.getenv("ARXIV_CACHE_TTL_S", str(6 * 3600)))
+    arxiv_cache_stale_s: float = float(os.getenv("ARXIV_CACHE_STALE_S", str(7 * 24 * 3600)))
+
+    # near-duplicate detection (title+abstract shingle Jaccard); 0 = exact titles only
+    dedupe_threshold: float = float(os.getenv("DEDUPE_THRESHOLD", "0.7"))
+
+    # bulk harvester (arXiv asks for at most one request every 3 seconds)
+    arxiv_request_interval_s: float = float(os.getenv("ARXIV_REQUEST_INTERVAL_S", "3.0"))
+    harvest_page_size: int = int(os.getenv("HARVEST_PAGE_SIZE", "200"))
+    harvest_concurrency: int = int(os.getenv("HARVEST_CONCURRENCY", "4"))
+    harvest_max_retries: int = int(os.getenv("HARVEST_MAX_RETRIES", "4"))
+
+    # model-based evaluation metrics (rougeL / bertscore_f1 / citation_grounding)
+    eval_model_metrics: bool = os.getenv("EVAL_MODEL_METRICS", "true").lower() == "true"
+    eval_workers: int = int(os.getenv("EVAL_WORKERS", "1"))  # 0 = score in a thread
+    eval_cache_size: int = int(os.getenv("EVAL_CACHE_SIZE", "4096"))  # abstracts kept encoded
+    grounding_threshold: float = float(os.getenv("GROUNDING_THRESHOLD", "0.5"))
+
+    # MLflow run tracking, written by a background thread
+    tracking_enabled: bool = os.getenv("TRACKING_ENABLED", "true").lower() == "true"
+    mlflow_tracking_uri: str = os.getenv("MLFLOW_TRACKING_URI", "file:./mlruns")
+    tracking_queue_size: int = int(os.getenv("TRACKING_QUEUE_SIZE", "1000"))
+
+    # durable job queue; JOB_WORKERS=0 when workers run separately (python -m jobs.worker)
+    job_db_path: str = os.getenv("JOB_DB_PATH", "./.cache/jobs.sqlite")
+    job_workers: int = int(os.getenv("JOB_WORKERS", "1"))
+    job_lease_s: float = float(os.getenv("JOB_LEASE_S", "120"))
+    job_max_attempts: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    job_poll_s: float = float(os.getenv("JOB_POLL_S", "1.0"))
+    # minimum wait before a job turned away by a full LLM queue runs again
+    job_retry_delay_s: float = float(os.getenv("JOB_RETRY_DELAY_S", "5"))
+
+    # planner: "llm" asks the model for a plan, "local" extracts keywords with RAKE
+    planner_mode: str = os.getenv("PLANNER_MODE", "llm")
+    plan_cache_size: int = int(os.getenv("PLAN_CACHE_SIZE", "1024"))
+
+    # process-wide LLM governor: per-provider concurrency / tokens-per-minute (0 = unlimited)
+    llm_concurrency_openai: int = int(os.getenv("LLM_CONCURRENCY_OPENAI", "8"))
+    llm_concurrency_ollama: int = int(os.getenv("LLM_CONCURRENCY_OLLAMA", "2"))
+    llm_concurrency_mock: int = int(os.getenv("LLM_CONCURRENCY_MOCK", "0"))
+    llm_tpm_openai: int = int(os.getenv("LLM_TPM_OPENAI", "0"))
+    llm_tpm_ollama: int = int(os.getenv("LLM_TPM_OLLAMA", "0"))
+    llm_max_queue: int = int(os.getenv("LLM_MAX_QUEUE", "64"))  # waiting calls before 503
+    llm_completion_tokens_estimate: int = int(os.getenv("LLM_COMPLETION_TOKENS_ESTIMATE", "800"))
+    llm_timeout_s: float = float(os.getenv("LLM_TIMEOUT_S", "120"))
+
+    # provider chain: LLM_PROVIDER first, then these (comma-separated), e.g. "openai"
+    llm_fallback_providers: str = os.getenv("LLM_FALLBACK_PROVIDERS", "")
+    llm_hedge_after_s: float = float(os.getenv("LLM_HEDGE_AFTER_S", "8"))  # no first token by then -> next provider; 0 = failover only
+    llm_breaker_failures: int = int(os.getenv("LLM_BREAKER_FAILURES", "5"))  # consecutive errors that open a circuit
+    llm_breaker_reset_s: float = float(os.getenv("LLM_BREAKER_RESET_S", "30"))
+
+    # startup warm-up (provider, scoring and embedding models) gating GET /ready
+    warmup_enabled: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    warmup_timeout_s: float = float(os.getenv("WARMUP_TIMEOUT_S", "180"))
+    # /ready waits for the primary provider's warm-up, retried at this interval
+    warmup_retry_s: float = float(os.getenv("WARMUP_RETRY_S", "10"))
+
 settings = Settings()
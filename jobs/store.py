@@ -0,0 +1,168 @@
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# columns added after the first release; old databases get them on open
+_ADDED_COLUMNS = (("partial", "TEXT"), ("run_after", "REAL"))
+
+
+class JobStore:
+    """
+    SQLite-backed job queue shared by the API and any number of worker
+    processes. A worker claims a job with a lease and keeps extending it
+    while the job runs; if the worker dies, the lease runs out and another
+    worker picks the job up again (up to max_attempts).
+
+    Status: queued -> running -> done | failed, or back to queued with
+    retry() (not before `run_after`) when the job could not run for now.
+
+    While a job runs, `partial` holds what is known so far (plan, papers,
+    the summary text as it streams) so clients can render it early.
+    """
+
+    def __init__(self, path: str, lease_s: float = 300.0, max_attempts: int = 3):
+        self.lease_s = lease_s
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # autocommit; claims use explicit BEGIN IMMEDIATE across processes
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, status TEXT NOT NULL, request TEXT NOT NULL,"
+            " progress TEXT, result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0,"
+            " worker TEXT, lease_until REAL, created_at REAL NOT NULL,"
+            " started_at REAL, finished_at REAL, partial TEXT, run_after REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self._migrate()
+
+    def _migrate(self):
+        # the API and the workers open the same file at once: check and
+        # alter under the write lock so only one of them adds each column
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            have = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for name, kind in _ADDED_COLUMNS:
+                if name not in have:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def submit(self, request: dict) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, request, progress, created_at) VALUES (?, 'queued', ?, 'queued', ?)",
+                (job_id, json.dumps(request), time.time()),
+            )
+        return job_id
+
+    def get(self, job_id: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, progress, partial, result, error, attempts, created_at, started_at, finished_at"
+                " FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = (
+            "id", "status", "progress", "partial", "result", "error",
+            "attempts", "created_at", "started_at", "finished_at",
+        )
+        job = dict(zip(keys, row))
+        job["partial"] = json.loads(job["partial"]) if job["partial"] else None
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def claim(self, worker: str):
+        """
+        Leases the oldest runnable job to `worker`: queued (and past its
+        run_after), or running with an expired lease. Returns (job_id,
+        request) or None.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # jobs whose workers kept dying give up instead of looping forever
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', progress = 'failed', finished_at = ?,"
+                    " error = 'worker lost too many times' WHERE status = 'running'"
+                    " AND lease_until < ? AND attempts >= ?",
+                    (now, now, self.max_attempts),
+                )
+                row = self._conn.execute(
+                    "SELECT id, request FROM jobs WHERE (status = 'queued' AND (run_after IS NULL OR run_after <= ?))"
+                    " OR (status = 'running' AND lease_until < ?) ORDER BY created_at LIMIT 1",
+                    (now, now),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', worker = ?, lease_until = ?,"
+                        " attempts = attempts + 1, started_at = ?, partial = NULL WHERE id = ?",
+                        (worker, now + self.lease_s, now, row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return (row[0], json.loads(row[1])) if row else None
+
+    def heartbeat(self, job_id: str, worker: str, progress=None, partial=None) -> bool:
+        """
+        Extends the lease (and optionally records progress and partial
+        results). False means the job was reclaimed by someone else and
+        this worker should stop.
+        """
+        partial = json.dumps(partial) if partial is not None else None
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET lease_until = ?, progress = COALESCE(?, progress),"
+                " partial = COALESCE(?, partial) WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time() + self.lease_s, progress, partial, job_id, worker),
+            )
+        return cur.rowcount == 1
+
+    def complete(self, job_id: str, worker: str, result) -> bool:
+        return self._finish(job_id, worker, "done", result=json.dumps(result))
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        return self._finish(job_id, worker, "failed", error=error)
+
+    def retry(self, job_id: str, worker: str, delay_s: float) -> bool:
+        """
+        Releases the lease and queues the job again, to be claimed no
+        sooner than delay_s from now. The attempt is not counted against
+        max_attempts: the job did not fail, it was turned away.
+        """
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', progress = 'queued', worker = NULL, lease_until = NULL,"
+                " partial = NULL, attempts = attempts - 1, run_after = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time() + delay_s, job_id, worker),
+            )
+        return cur.rowcount == 1
+
+    def _finish(self, job_id, worker, status, result=None, error=None):
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = ?, progress = ?, result = ?, error = ?, finished_at = ?,"
+                " lease_until = NULL, partial = NULL WHERE id = ? AND worker = ? AND status = 'running'",
+                (status, status, result, error, time.time(), job_id, worker),
+            )
+        return cur.rowcount == 1
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
@@ -0,0 +1,153 @@
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+from config.settings import settings
+from agents._llm import LLMOverloaded
+from agents.tracking import flush_tracking
+from jobs.store import JobStore
+
+_store = None
+
+PARTIAL_SAVE_S = 0.5
+
+
+def get_job_store():
+    global _store
+    if _store is None:
+        _store = JobStore(
+            settings.job_db_path,
+            lease_s=settings.job_lease_s,
+            max_attempts=settings.job_max_attempts,
+        )
+    return _store
+
+
+async def _run_job(store, worker, job_id, request):
+    from agents.pipeline import arun_summarization
+    from api.schemas import SummarizeReq
+
+    async def on_stage(stage):
+        await asyncio.to_thread(store.heartbeat, job_id, worker, stage)
+
+    partial, saved = {}, [0.0]
+
+    async def on_partial(key, value):
+        # streamed summary text is saved a few times a second, not per token
+        partial[key] = value
+        if key == "summary_text" and time.monotonic() - saved[0] < PARTIAL_SAVE_S:
+            return
+        saved[0] = time.monotonic()
+        await asyncio.to_thread(store.heartbeat, job_id, worker, None, dict(partial))
+
+    async def keep_leased(task):
+        # renew well before the lease runs out; stop if the job was taken over
+        while not task.done():
+            await asyncio.sleep(store.lease_s / 3)
+            if not await asyncio.to_thread(store.heartbeat, job_id, worker):
+                task.cancel()
+
+    task = asyncio.ensure_future(
+        arun_summarization(SummarizeReq(**request), on_stage=on_stage, on_partial=on_partial)
+    )
+    lease = asyncio.ensure_future(keep_leased(task))
+    try:
+        result = await task
+    except asyncio.CancelledError:
+        return
+    except LLMOverloaded as e:
+        # the provider turned us away: give the job back for later instead
+        # of failing it (another worker may have capacity sooner)
+        delay = max(float(e.retry_after), settings.job_retry_delay_s)
+        await asyncio.to_thread(store.retry, job_id, worker, delay)
+        return
+    except Exception as e:
+        await asyncio.to_thread(store.fail, job_id, worker, str(e) or type(e).__name__)
+        return
+    finally:
+        lease.cancel()
+    await asyncio.to_thread(store.complete, job_id, worker, result)
+
+
+async def _work(stop):
+    store = get_job_store()
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    while not stop.is_set():
+        job = await asyncio.to_thread(store.claim, worker)
+        if job is None:
+            await asyncio.sleep(settings.job_poll_s)
+            continue
+        await _run_job(store, worker, *job)
+
+
+def run_worker(stop=None):
+    """
+    Claims and runs jobs until `stop` (a multiprocessing.Event) is set or
+    the process gets SIGTERM/SIGINT; a job in progress is finished first.
+    A second signal exits at once. Queued tracking runs are flushed on exit.
+    """
+    stop = stop or multiprocessing.Event()
+    # this process is already off the API tier: score in-process
+    settings.eval_workers = 0
+
+    def on_signal(*_):
+        stop.set()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, signal.SIG_DFL)
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, on_signal)
+    asyncio.run(_work(stop))
+    flush_tracking()
+
+
+def start_workers(n: int):
+    """
+    Starts n worker processes; returns (processes, stop_event).
+    """
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event()
+    procs = [ctx.Process(target=run_worker, args=(stop,), name=f"job-worker-{i}", daemon=True) for i in range(n)]
+    for p in procs:
+        p.start()
+    return procs, stop
+
+
+def stop_workers(procs, stop, timeout: float = 10.0):
+    """
+    Asks the workers to stop and waits up to `timeout` seconds in total;
+    workers still busy after that are killed.
+    """
+    stop.set()
+    deadline = time.monotonic() + timeout
+    for p in procs:
+        p.join(max(0.0, deadline - time.monotonic()))
+        if p.is_alive():
+            # SIGTERM would only ask it to stop again; its job is re-run by
+            # another worker once the lease expires
+            p.kill()
+            p.join()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run summarization job workers.")
+    ap.add_argument("--workers", type=int, default=max(settings.job_workers, 1))
+    args = ap.parse_args()
+
+    if args.workers == 1:
+        run_worker()
+        return
+    procs, stop = start_workers(args.workers)
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+    stop.wait()
+    stop_workers(procs, stop)
+
+
+if __name__ == "__main__":
+    main()
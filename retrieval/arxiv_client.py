@@ -1,61 +1,286 @@
 
-import requests
+import asyncio
+import threading
+import time
+import httpx
 import xml.etree.ElementTree as ET
 from datetime import datetime
+from config.settings import settings
+from retrieval.cache import QueryCache, query_key
+from agents import telemetry
 
-ARXIV_API = "http://export.arxiv.org/api/query"
+OFFLINE_URL = "http://arxiv.org/abs/0000.00000"
 
-def search_arxiv(query: str, max_results=12, start=0, categories=("cs.LG","cs.AI")):
+_session = None
+_session_lock = threading.Lock()
+_async_client = None
+_query_cache = None
+_background = set()  # strong refs to in-flight revalidation tasks
+
+def _build_params(query: str, max_results=12, start=0, categories=("cs.LG","cs.AI")):
     if not query:
         query = "machine learning"
     q = f'all:"{query}"'
     if categories:
         cats = " OR ".join([f"cat:{c}" for c in categories])
         q = f"({q}) AND ({cats})"
-    params = {
+    return {
         "search_query": q,
         "start": start,
         "max_results": max_results,
         "sortBy": "submittedDate",
         "sortOrder": "descending"
     }
+
+def _offline_fallback():
+    # Offline fallback minimal mock
+    return [{
+        "title": "Mock arXiv Paper",
+        "authors": ["Author A"],
+        "year": 2024,
+        "abstract": "Mock abstract when offline.",
+        "url": OFFLINE_URL,
+        "source": "arxiv"
+    }]
+
+def get_query_cache():
+    global _query_cache
+    if _query_cache is None and settings.arxiv_cache_enabled:
+        _query_cache = QueryCache(
+            settings.arxiv_cache_path,
+            ttl_s=settings.arxiv_cache_ttl_s,
+            stale_s=settings.arxiv_cache_stale_s,
+        )
+    return _query_cache
+
+def get_session():
+    """
+    Process-wide keep-alive session for the sync client and the harvester.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests  # only the sync paths need it
+
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+    return _session
+
+def _fetch(params):
+    t = time.perf_counter()
+    try:
+        r = get_session().get(settings.arxiv_api_url, params=params, timeout=20)
+        r.raise_for_status()
+        return parse_arxiv_atom(r.text)
+    except Exception as e:
+        telemetry.ARXIV_ERRORS.labels(type(e).__name__).inc()
+        raise
+    finally:
+        telemetry.ARXIV_SECONDS.observe(time.perf_counter() - t)
+
+def _refresh(key, params):
+    cache = get_query_cache()
+    try:
+        cache.put(key, _fetch(params))
+    except Exception:
+        pass
+    finally:
+        cache.end_refresh(key)
+
+def search_arxiv(query: str, max_results=12, start=0, categories=("cs.LG","cs.AI")):
+    params = _build_params(query, max_results, start, categories)
+    cache = get_query_cache()
+    key = query_key(params, categories)
+    cached, state = cache.lookup(key) if cache else (None, "miss")
+
+    if cache:
+        telemetry.record_cache("arxiv", {"fresh": "hit", "stale": "stale"}.get(state, "miss"))
+    if state == "fresh":
+        return cached
+    if state == "stale":
+        # serve stale, revalidate in the background
+        if cache.begin_refresh(key):
+            threading.Thread(target=_refresh, args=(key, params), daemon=True).start()
+        return cached
+
+    try:
+        papers = _fetch(params)
+    except Exception:
+        return cached or _offline_fallback()
+    if cache:
+        cache.put(key, papers)
+    return papers
+
+def _get_async_client():
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        # one pooled keep-alive client per process, shared by all requests
+        _async_client = httpx.AsyncClient(
+            timeout=20,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _async_client
+
+async def aclose_client():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+async def _afetch(params):
+    t = time.perf_counter()
     try:
-        r = requests.get(ARXIV_API, params=params, timeout=20)
+        r = await _get_async_client().get(settings.arxiv_api_url, params=params)
         r.raise_for_status()
         return parse_arxiv_atom(r.text)
+    except Exception as e:
+        telemetry.ARXIV_ERRORS.labels(type(e).__name__).inc()
+        raise
+    finally:
+        telemetry.ARXIV_SECONDS.observe(time.perf_counter() - t)
+
+async def _arefresh(key, params):
+    cache = get_query_cache()
+    try:
+        papers = await _afetch(params)
+        await asyncio.to_thread(cache.put, key, papers)
+    except Exception:
+        pass
+    finally:
+        cache.end_refresh(key)
+
+async def asearch_arxiv(query: str, max_results=12, start=0, categories=("cs.LG","cs.AI")):
+    params = _build_params(query, max_results, start, categories)
+    cache = get_query_cache()
+    key = query_key(params, categories)
+    cached, state = await asyncio.to_thread(cache.lookup, key) if cache else (None, "miss")
+
+    if cache:
+        telemetry.record_cache("arxiv", {"fresh": "hit", "stale": "stale"}.get(state, "miss"))
+    if state == "fresh":
+        return cached
+    if state == "stale":
+        if cache.begin_refresh(key):
+            task = asyncio.create_task(_arefresh(key, params))
+            _background.add(task)
+            task.add_done_callback(_background.discard)
+        return cached
+
+    try:
+        papers = await _afetch(params)
     except Exception:
-        # Offline fallback minimal mock
-        return [{
-            "title": "Mock arXiv Paper",
-            "authors": ["Author A"],
-            "year": 2024,
-            "abstract": "Mock abstract when offline.",
-            "url": "http://arxiv.org/abs/0000.00000",
-            "source": "arxiv"
-        }]
+        return cached or _offline_fallback()
+    if cache:
+        await asyncio.to_thread(cache.put, key, papers)
+    return papers
+
+ATOM_NS = {"a":"http://www.w3.org/2005/Atom"}
+_ENTRY_TAG = "{http://www.w3.org/2005/Atom}entry"
+_CHUNK = 64 * 1024
+
+def _entry_to_paper(entry, ns=ATOM_NS):
+    title = (entry.findtext("a:title", default="", namespaces=ns) or "").strip().replace("\n"," ")
+    abstract = (entry.findtext("a:summary", default="", namespaces=ns) or "").strip()
+    link = ""
+    for l in entry.findall("a:link", ns):
+        if l.attrib.get("type") == "text/html":
+            link = l.attrib.get("href","")
+    authors = [a.findtext("a:name", default="", namespaces=ns) for a in entry.findall("a:author", ns)]
+    pub = entry.findtext("a:published", default="", namespaces=ns)
+    year = None
+    if pub:
+        try:
+            year = datetime.fromisoformat(pub.replace("Z","")).year
+        except Exception:
+            pass
+    return {
+        "title": title, "authors": authors, "year": year,
+        "abstract": abstract, "url": link or "",
+        "source": "arxiv"
+    }
+
+_TITLE = "{http://www.w3.org/2005/Atom}title"
+_SUMMARY = "{http://www.w3.org/2005/Atom}summary"
+_LINK = "{http://www.w3.org/2005/Atom}link"
+_AUTHOR = "{http://www.w3.org/2005/Atom}author"
+_NAME = "{http://www.w3.org/2005/Atom}name"
+_PUBLISHED = "{http://www.w3.org/2005/Atom}published"
+_TOTAL_RESULTS = "{http://a9.com/-/spec/opensearch/1.1/}totalResults"
+
+def _entry_to_paper_single_pass(entry):
+    # same output as _entry_to_paper, but one walk over the children
+    # instead of a findall/findtext per field
+    first = {}
+    link = ""
+    authors = []
+    for child in entry:
+        tag = child.tag
+        if tag == _LINK:
+            if child.attrib.get("type") == "text/html":
+                link = child.attrib.get("href","")
+        elif tag == _AUTHOR:
+            name = child.find(_NAME)
+            authors.append("" if name is None else (name.text or ""))
+        elif tag not in first:
+            first[tag] = child.text or ""
+    pub = first.get(_PUBLISHED, "")
+    year = None
+    if pub:
+        try:
+            year = datetime.fromisoformat(pub.replace("Z","")).year
+        except Exception:
+            pass
+    return {
+        "title": first.get(_TITLE, "").strip().replace("\n"," "),
+        "authors": authors, "year": year,
+        "abstract": first.get(_SUMMARY, "").strip(), "url": link or "",
+        "source": "arxiv"
+    }
 
 def parse_arxiv_atom(atom_xml: str):
-    ns = {"a":"http://www.w3.org/2005/Atom"}
     root = ET.fromstring(atom_xml)
-    results = []
-    for entry in root.findall("a:entry", ns):
-        title = (entry.findtext("a:title", default="", namespaces=ns) or "").strip().replace("\n"," ")
-        abstract = (entry.findtext("a:summary", default="", namespaces=ns) or "").strip()
-        link = ""
-        for l in entry.findall("a:link", ns):
-            if l.attrib.get("type") == "text/html":
-                link = l.attrib.get("href","")
-        authors = [a.findtext("a:name", default="", namespaces=ns) for a in entry.findall("a:author", ns)]
-        pub = entry.findtext("a:published", default="", namespaces=ns)
-        year = None
-        if pub:
-            try:
-                year = datetime.fromisoformat(pub.replace("Z","")).year
-            except Exception:
-                pass
-        results.append({
-            "title": title, "authors": authors, "year": year,
-            "abstract": abstract, "url": link or "",
-            "source": "arxiv"
-        })
-    return results
+    return [_entry_to_paper(entry) for entry in root.findall("a:entry", ATOM_NS)]
+
+def iter_arxiv_atom_chunks(chunks, feed_meta=None):
+    """
+    Incremental Atom parser: feed it an iterable of bytes/str chunks (e.g.
+    requests' iter_content or httpx's iter_bytes) and it yields one paper
+    dict per completed <entry>, dropping each parsed entry from the tree so
+    memory stays flat regardless of page size.
+
+    If `feed_meta` is a dict, opensearch:totalResults is stored in it as
+    "total_results" once seen.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root = None
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = elem
+            elif elem.tag == _TOTAL_RESULTS and feed_meta is not None:
+                try:
+                    feed_meta["total_results"] = int(elem.text or 0)
+                except ValueError:
+                    pass
+            elif elem.tag == _ENTRY_TAG:
+                yield _entry_to_paper_single_pass(elem)
+                elem.clear()
+                root.remove(elem)
+    parser.close()
+
+def iter_arxiv_atom(source, feed_meta=None):
+    """
+    Streaming counterpart of parse_arxiv_atom. `source` may be Atom text,
+    bytes, or a binary file-like object such as an open fixture file or a
+    streamed HTTP body (requests: r.raw with decode_content=True).
+    """
+    if isinstance(source, (str, bytes)):
+        step = _CHUNK
+        chunks = (source[i:i + step] for i in range(0, len(source), step))
+    else:
+        chunks = iter(lambda: source.read(_CHUNK), b"")
+    return iter_arxiv_atom_chunks(chunks, feed_meta)
@@ -0,0 +1,79 @@
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def query_key(params, categories=()) -> str:
+    return json.dumps({
+        "search_query": params.get("search_query"),
+        "start": params.get("start"),
+        "max_results": params.get("max_results"),
+        "categories": sorted(categories or ()),
+    }, sort_keys=True)
+
+
+class QueryCache:
+    """
+    Disk cache of parsed arXiv entries keyed by the compiled query.
+    Entries are fresh for ttl_s and may be served stale for another stale_s
+    while a refresh runs in the background.
+    """
+
+    def __init__(self, path: str, ttl_s: float, stale_s: float):
+        self.ttl_s = ttl_s
+        self.stale_s = stale_s
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS queries ("
+            " key TEXT PRIMARY KEY, papers TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def lookup(self, key: str):
+        """
+        Returns (papers, state) where state is "fresh", "stale" or "expired",
+        or (None, "miss").
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT papers, fetched_at FROM queries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None, "miss"
+        age = time.time() - row[1]
+        if age <= self.ttl_s:
+            state = "fresh"
+        elif age <= self.ttl_s + self.stale_s:
+            state = "stale"
+        else:
+            state = "expired"
+        return json.loads(row[0]), state
+
+    def put(self, key: str, papers) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO queries (key, papers, fetched_at) VALUES (?, ?, ?)",
+                (key, json.dumps(papers), time.time()),
+            )
+            self._conn.commit()
+
+    def begin_refresh(self, key: str) -> bool:
+        # only one background refresh per key at a time
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, key: str) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
@@ -0,0 +1,210 @@
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from agents import telemetry
+from config.settings import settings
+from retrieval.arxiv_client import _build_params, get_session, iter_arxiv_atom
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, at most `burst` banked.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HarvestCursor:
+    """
+    Which pages of a harvest are done, persisted as JSON so an interrupted
+    harvest resumes where it stopped.
+    """
+
+    def __init__(self, path=None, query="", categories=(), page_size=200):
+        self.path = path
+        self.query = query
+        self.categories = list(categories or ())
+        self.page_size = page_size
+        self.total_results = None
+        self.done = set()
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            same = (state.get("query"), state.get("categories"), state.get("page_size")) == (
+                self.query, self.categories, self.page_size
+            )
+            if same:
+                self.total_results = state.get("total_results")
+                self.done = set(state.get("done", []))
+
+    def mark(self, start: int, total_results=None):
+        with self._lock:
+            self.done.add(start)
+            if total_results is not None:
+                self.total_results = total_results
+            if self.path:
+                tmp = self.path + ".tmp"
+                with open(tmp, "w") as f:
+                    json.dump({
+                        "query": self.query,
+                        "categories": self.categories,
+                        "page_size": self.page_size,
+                        "total_results": self.total_results,
+                        "done": sorted(self.done),
+                    }, f)
+                os.replace(tmp, self.path)
+
+
+_bucket = None
+_bucket_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    # one limiter per process so parallel harvests share arXiv's budget
+    global _bucket
+    with _bucket_lock:
+        if _bucket is None:
+            _bucket = TokenBucket(rate=1.0 / max(settings.arxiv_request_interval_s, 1e-6), burst=1)
+    return _bucket
+
+
+def fetch_page(query, start, page_size, categories=("cs.LG","cs.AI"), limiter=None, max_retries=None):
+    """
+    One rate-limited page fetch with exponential backoff. Returns
+    (papers, total_results); total_results is None if the feed omitted it.
+    """
+    limiter = limiter or get_rate_limiter()
+    retries = settings.harvest_max_retries if max_retries is None else max_retries
+    params = _build_params(query, page_size, start, categories)
+
+    for attempt in range(retries + 1):
+        limiter.acquire()
+        t = time.perf_counter()
+        try:
+            with get_session().get(settings.arxiv_api_url, params=params, timeout=60, stream=True) as r:
+                if r.status_code in RETRY_STATUS:
+                    raise IOError(f"arXiv returned {r.status_code}")
+                r.raise_for_status()
+                r.raw.decode_content = True
+                meta = {}
+                papers = list(iter_arxiv_atom(r.raw, meta))
+            telemetry.ARXIV_SECONDS.observe(time.perf_counter() - t)
+            return papers, meta.get("total_results")
+        except Exception as e:
+            telemetry.ARXIV_SECONDS.observe(time.perf_counter() - t)
+            telemetry.ARXIV_ERRORS.labels(type(e).__name__).inc()
+            if attempt == retries:
+                raise
+            time.sleep(min(60.0, 2 ** attempt) + random.uniform(0, 1))
+
+
+def harvest(
+    query: str,
+    max_papers: int = 1000,
+    categories=("cs.LG","cs.AI"),
+    page_size=None,
+    concurrency=None,
+    cursor_path=None,
+):
+    """
+    Yields up to `max_papers` papers for `query` page by page (pages in
+    completion order).
+
+    Page requests are issued no faster than ARXIV_REQUEST_INTERVAL_S but up
+    to `concurrency` of them may be in flight on the shared keep-alive
+    session. Pass `cursor_path` to make the harvest resumable.
+    """
+    if max_papers <= 0:
+        return
+    page_size = min(page_size or settings.harvest_page_size, max_papers)
+    concurrency = concurrency or settings.harvest_concurrency
+    cursor = HarvestCursor(cursor_path, query, categories, page_size)
+    left = max_papers
+
+    # first page alone tells us how many results exist
+    if 0 not in cursor.done:
+        papers, total = fetch_page(query, 0, page_size, categories)
+        yield from papers[:left]
+        left -= min(len(papers), left)
+        cursor.mark(0, total if total is not None else (len(papers) if len(papers) < page_size else None))
+
+    limit = max_papers if cursor.total_results is None else min(max_papers, cursor.total_results)
+    starts = [s for s in range(page_size, limit, page_size) if s not in cursor.done]
+
+    ex = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="harvest")
+    try:
+        # the last page only asks for what is left under the limit
+        futures = {ex.submit(fetch_page, query, s, min(page_size, limit - s), categories): s for s in starts}
+        for fut in as_completed(futures):
+            if left <= 0:
+                break
+            papers, _ = fut.result()
+            yield from papers[:left]
+            left -= min(len(papers), left)
+            cursor.mark(futures[fut])
+    finally:
+        # a consumer that stops early shouldn't wait for the remaining pages
+        ex.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Bulk-harvest arXiv results for a topic.")
+    ap.add_argument("query")
+    ap.add_argument("--max", type=int, default=1000)
+    ap.add_argument("--cursor", default=None, help="JSON file for resumable progress")
+    ap.add_argument("--out", default=None, help="append papers as JSON lines")
+    ap.add_argument("--index", action="store_true", help="add papers to the local embedding index")
+    args = ap.parse_args()
+
+    if args.index:
+        from retrieval.local_index import get_local_index
+
+    out = open(args.out, "a") if args.out else None
+    batch, total = [], 0
+    try:
+        for p in harvest(args.query, max_papers=args.max, cursor_path=args.cursor):
+            total += 1
+            if out:
+                out.write(json.dumps(p) + "\n")
+            if args.index:
+                batch.append(p)
+                if len(batch) >= 256:
+                    get_local_index().add(batch)
+                    batch = []
+        if args.index and batch:
+            get_local_index().add(batch)
+    finally:
+        if out:
+            out.close()
+    print(f"harvested {total} papers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+
+import json
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+
+from config.settings import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, keep to one writer per directory
+    fcntl = None
+
+_index = None
+_index_lock = threading.Lock()
+# embedding is CPU-heavy; one background writer keeps it off the request path
+_ingest_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="local-index")
+
+
+class LocalIndex:
+    """
+    Offline corpus of already-fetched papers.
+
+    - meta.jsonl      one paper dict per row, append-only (cut back to
+                      `count` rows on open)
+    - vectors.f32     memory-mapped float32 matrix of unit-norm embeddings
+    - state.json      row count, dimension and embedding model
+    - .lock           flock held while appending, so the API and the job
+                      workers can all grow the same directory; each process
+                      picks up the others' rows from state.json
+
+    Search is exact (one matmul) up to `exact_max` rows; past that a
+    random-hyperplane LSH index narrows the candidates before re-ranking.
+    """
+
+    N_TABLES = 8
+    N_BITS = 12
+
+    def __init__(self, root: str, model_name: str, exact_max: int = 50000):
+        self.root = root
+        self.model_name = model_name
+        self.exact_max = exact_max
+        self._lock = threading.Lock()
+        self._model = None
+        self._model_lock = threading.Lock()
+
+        os.makedirs(root, exist_ok=True)
+        self._meta_path = os.path.join(root, "meta.jsonl")
+        self._vec_path = os.path.join(root, "vectors.f32")
+        self._state_path = os.path.join(root, "state.json")
+        self._lock_path = os.path.join(root, ".lock")
+
+        self.count = 0
+        self.dim = None
+        self.papers = []
+        self._ids = {}
+        self._meta_end = 0  # byte offset just past row `count` in meta.jsonl
+        self._stamp = None  # identity of the state.json last read
+        self._vectors = None
+        self._buckets = None
+
+        with self._locked():
+            state = self._read_state()
+            if state and state.get("model") != model_name:
+                raise ValueError(
+                    f"local index at {root} was built with {state.get('model')}, not {model_name}"
+                )
+            self._sync(state)
+            # rows past `count` come from an add() that died before writing
+            # state.json; drop them so the next append stays aligned with vectors
+            if os.path.exists(self._meta_path) and os.path.getsize(self._meta_path) > self._meta_end:
+                os.truncate(self._meta_path, self._meta_end)
+
+    # ---------- storage ----------
+    @staticmethod
+    def _key(p):
+        return p.get("url") or (p.get("title") or "").lower().strip()
+
+    def _open_vectors(self, capacity: int):
+        size = capacity * self.dim * 4
+        mode = "r+b" if os.path.exists(self._vec_path) else "w+b"
+        with open(self._vec_path, mode) as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < size:
+                f.truncate(size)
+        self._vectors = np.memmap(self._vec_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _ensure_capacity(self, rows: int):
+        if self._vectors is None or self._vectors.shape[0] < rows:
+            current = 0 if self._vectors is None else self._vectors.shape[0]
+            self._open_vectors(max(rows, current * 2, 1024))
+
+    def _write_state(self):
+        tmp = self._state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"count": self.count, "dim": self.dim, "model": self.model_name}, f)
+        os.replace(tmp, self._state_path)
+        self._stamp = self._state_stamp()
+
+    def _state_stamp(self):
+        try:
+            st = os.stat(self._state_path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns
+
+    def _read_state(self):
+        self._stamp = self._state_stamp()
+        if self._stamp is None:
+            return {}
+        with open(self._state_path) as f:
+            return json.load(f)
+
+    @contextmanager
+    def _locked(self, shared=False):
+        if fcntl is None:
+            yield
+            return
+        with open(self._lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _sync(self, state):
+        """
+        Loads the rows other processes appended since this one last looked.
+        Call with the file lock held.
+        """
+        count = state.get("count", 0)
+        if count <= self.count:
+            return
+        new = []
+        with open(self._meta_path, "rb") as f:
+            f.seek(self._meta_end)
+            for _ in range(count - self.count):
+                line = f.readline()
+                if not line:
+                    break
+                new.append(json.loads(line))
+            self._meta_end = f.tell()
+
+        start = self.count
+        for i, p in enumerate(new, start=start):
+            self.papers.append(p)
+            self._ids[self._key(p)] = i
+        self.count = start + len(new)
+        if self.dim is None:
+            self.dim = state["dim"]
+        self._ensure_capacity(self.count)
+        if self._buckets is None:
+            self._rebuild_buckets()
+        else:
+            self._add_to_buckets(start, np.asarray(self._vectors[start:self.count]))
+
+    # ---------- embeddings ----------
+    def _encode(self, texts):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name, device="cpu")
+        vecs = self._model.encode(
+            texts, batch_size=64, normalize_embeddings=True, convert_to_numpy=True, show_progress_bar=False
+        )
+        return np.asarray(vecs, dtype=np.float32)
+
+    def warm(self):
+        """
+        Loads the embedding model so the first search doesn't.
+        """
+        self._encode(["warm up"])
+
+    @staticmethod
+    def _text(p):
+        return f"{p.get('title','')}. {p.get('abstract','')}".strip()
+
+    # ---------- LSH ----------
+    def _planes(self):
+        rng = np.random.default_rng(0)
+        return rng.standard_normal((self.N_TABLES * self.N_BITS, self.dim)).astype(np.float32)
+
+    def _codes(self, vecs):
+        bits = (vecs @ self._planes_cache.T) > 0
+        bits = bits.reshape(len(vecs), self.N_TABLES, self.N_BITS)
+        weights = 1 << np.arange(self.N_BITS)
+        return (bits * weights).sum(axis=2)  # (n, tables)
+
+    def _rebuild_buckets(self):
+        self._planes_cache = self._planes()
+        self._buckets = [defaultdict(list) for _ in range(self.N_TABLES)]
+        if self.count:
+            self._add_to_buckets(0, np.asarray(self._vectors[: self.count]))
+
+    def _add_to_buckets(self, start, vecs):
+        for row, codes in enumerate(self._codes(vecs), start=start):
+            for t, code in enumerate(codes):
+                self._buckets[t][int(code)].append(row)
+
+    # ---------- public API ----------
+    def add(self, papers):
+        """
+        Embeds and appends papers not yet in the corpus. Returns how many were added.
+        """
+        with self._lock:
+            new, seen = [], set()
+            for p in papers:
+                k = self._key(p)
+                if k and k not in self._ids and k not in seen:
+                    seen.add(k)
+                    new.append(p)
+        if not new:
+            return 0
+
+        vecs = self._encode([self._text(p) for p in new])
+
+        with self._lock, self._locked():
+            # another process may have appended (some of) these meanwhile
+            self._sync(self._read_state())
+            keep = [i for i, p in enumerate(new) if self._key(p) not in self._ids]
+            if not keep:
+                return 0
+            new, vecs = [new[i] for i in keep], vecs[keep]
+
+            if self.dim is None:
+                self.dim = vecs.shape[1]
+                self._rebuild_buckets()
+            start = self.count
+            self._ensure_capacity(start + len(new))
+            self._vectors[start:start + len(new)] = vecs
+            self._vectors.flush()
+            with open(self._meta_path, "r+b" if os.path.exists(self._meta_path) else "wb") as f:
+                f.seek(self._meta_end)
+                f.truncate()
+                for p in new:
+                    f.write((json.dumps(p) + "\n").encode())
+                self._meta_end = f.tell()
+            for i, p in enumerate(new, start=start):
+                self.papers.append(p)
+                self._ids[self._key(p)] = i
+            self._add_to_buckets(start, vecs)
+            self.count = start + len(new)
+            self._write_state()
+        return len(new)
+
+    def search(self, query: str, k: int = 8):
+        if self._state_stamp() != self._stamp:
+            with self._lock, self._locked(shared=True):
+                self._sync(self._read_state())
+        if not self.count or not query:
+            return []
+        q = self._encode([query])[0]
+
+        with self._lock:
+            count = self.count
+            vectors = self._vectors
+            if count > self.exact_max:
+                codes = self._codes(q[None, :])[0]
+                cand = set()
+                for t, code in enumerate(codes):
+                    cand.update(self._buckets[t].get(int(code), ()))
+                candidates = np.fromiter(cand, dtype=np.int64) if len(cand) >= k else None
+            else:
+                candidates = None
+
+        if candidates is None:
+            scores = np.asarray(vectors[:count]) @ q
+            ids = np.arange(count)
+        else:
+            scores = np.asarray(vectors[candidates]) @ q
+            ids = candidates
+
+        top = np.argsort(-scores)[:k] if len(scores) <= k else np.argpartition(-scores, k)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self.papers[int(ids[i])] for i in top]
+
+
+def get_local_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = LocalIndex(
+                settings.local_index_dir,
+                settings.embedding_model,
+                exact_max=settings.local_index_exact_max,
+            )
+    return _index
+
+
+def search_local(query: str, max_results: int = 8):
+    try:
+        return get_local_index().search(query, k=max_results)
+    except Exception:
+        # missing model / empty corpus: behave like a source with no hits
+        return []
+
+
+def _ingest(papers):
+    try:
+        get_local_index().add(papers)
+    except Exception:
+        pass
+
+
+def index_in_background(papers):
+    """
+    Queues freshly fetched papers for embedding into the local corpus.
+    """
+    if settings.local_index_enabled and papers:
+        _ingest_pool.submit(_ingest, list(papers))
@@ -1,12 +1,156 @@
 
 import re
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+from config.settings import settings
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_rng = np.random.default_rng(1)
+NUM_PERM = 64
+BANDS = 16  # 16 bands x 4 rows: 1-(1-J**4)**16, so p ~= 0.988 at Jaccard 0.7, > 0.9997 at 0.8
+SHINGLE_K = 3
+# multiply-shift hashing: h(x) = (a*x + b) >> 32 with uint64 wraparound
+_HASH_A = np.uint64(int(_rng.integers(1, 2**63)) | 1)
+_HASH_B = np.uint64(int(_rng.integers(0, 2**63)))
+_BAND_MIX = _rng.integers(1, 2**63, size=NUM_PERM // BANDS, dtype=np.uint64)
+_BIN_BITS = 6  # 2**6 == NUM_PERM bins
+_EMPTY = np.uint64(2**64 - 1)
 
 def canonical_title(t: str) -> str:
     t = (t or "").lower().strip()
     t = re.sub(r"\s+", " ", t)
     return t
 
-def dedupe(papers):
+@lru_cache(maxsize=1 << 18)
+def _word_hash(w: str) -> int:
+    return zlib.crc32(w.encode())
+
+def _word_ids(p) -> np.ndarray:
+    text = f"{p.get('title','')} {p.get('abstract','')}".lower()
+    return np.fromiter(map(_word_hash, _WORD_RE.findall(text)), dtype=np.uint64)
+
+def _shingle_hashes(ids_list, k: int = SHINGLE_K):
+    """
+    Hashed word k-gram shingles for many records in one pass. Returns
+    (flat, offsets, sizes): the shingles of record i are
+    flat[offsets[i]:offsets[i] + sizes[i]]. Records shorter than k words
+    get no shingles.
+    """
+    lengths = np.fromiter((len(a) for a in ids_list), dtype=np.int64, count=len(ids_list))
+    sizes = np.maximum(lengths - k + 1, 0)
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.int64)
+    if not sizes.sum():
+        return np.zeros(0, dtype=np.uint64), offsets, sizes
+    words = np.concatenate(ids_list)
+
+    # rolling polynomial over every window of the flat word stream
+    n = len(words) - k + 1
+    h = np.zeros(n, dtype=np.uint64)
+    for j in range(k):
+        h = h * np.uint64(1000003) + words[j:j + n]
+
+    # keep only windows that start and end inside the same record
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    keep = np.repeat(starts - offsets, sizes) + np.arange(sizes.sum())
+    return h[keep] & np.uint64(0xFFFFFFFF), offsets, sizes
+
+def shingles(p, k: int = SHINGLE_K) -> set:
+    """
+    Hashed word k-gram shingles over title + abstract.
+    """
+    flat, _, _ = _shingle_hashes([_word_ids(p)], k)
+    return set(flat.tolist())
+
+def minhash_many(flat, offsets, sizes):
+    """
+    MinHash signatures for every record with at least one shingle, using
+    one-permutation hashing: each shingle is hashed once, the top bits pick
+    one of NUM_PERM bins and each bin keeps its minimum. Empty bins borrow
+    the next non-empty bin (rotation densification). This is O(shingles)
+    instead of O(shingles * NUM_PERM). Returns (record indices, signatures).
+    """
+    idx = np.flatnonzero(sizes)
+    if not len(idx):
+        return idx, np.zeros((0, NUM_PERM), dtype=np.uint64)
+
+    value_bits = 32 - _BIN_BITS
+    hashed = (flat * _HASH_A + _HASH_B) >> np.uint64(32)
+    bins = hashed >> np.uint64(value_bits)
+    rows = np.repeat(np.arange(len(idx), dtype=np.uint64), sizes[idx])
+
+    # per (record, bin) minimum via one sort of (cell, value) packed keys
+    cell = rows * np.uint64(NUM_PERM) + bins
+    packed = np.sort((cell << np.uint64(value_bits)) | (hashed & np.uint64((1 << value_bits) - 1)))
+    cell = (packed >> np.uint64(value_bits)).astype(np.int64)
+    values = packed & np.uint64((1 << value_bits) - 1)
+    first = np.concatenate(([True], cell[1:] != cell[:-1]))
+    sigs = np.full(len(idx) * NUM_PERM, _EMPTY, dtype=np.uint64)
+    sigs[cell[first]] = values[first]
+    sigs = sigs.reshape(len(idx), NUM_PERM)
+
+    empty = sigs == _EMPTY
+    if empty.any():
+        # index of the next non-empty bin to the right, wrapping around
+        pos = np.where(~empty, np.arange(NUM_PERM), 2 * NUM_PERM)
+        doubled = np.concatenate((pos, pos + NUM_PERM), axis=1)
+        nxt = np.minimum.accumulate(doubled[:, ::-1], axis=1)[:, ::-1][:, :NUM_PERM] % NUM_PERM
+        filled = np.take_along_axis(sigs, nxt, axis=1)
+        # offset by the distance travelled so borrowed values stay bin-specific
+        dist = (nxt - np.arange(NUM_PERM)) % NUM_PERM
+        sigs = np.where(empty, filled + dist.astype(np.uint64) * np.uint64(1 << 32), sigs)
+    return idx, sigs
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def dedupe(papers, threshold=None):
+    """
+    Drops exact title duplicates and, when threshold > 0, near-duplicates
+    whose title+abstract shingle Jaccard similarity is >= threshold (arXiv
+    versions, preprint/journal pairs, the same paper from two sources).
+
+    MinHash + LSH banding keeps this roughly linear in len(papers); banded
+    candidates are confirmed with exact Jaccard. The first occurrence wins.
+    """
+    threshold = settings.dedupe_threshold if threshold is None else threshold
+    unique = _dedupe_exact(papers)
+    if threshold <= 0 or len(unique) < 2:
+        return unique
+
+    flat, offsets, sizes = _shingle_hashes([_word_ids(p) for p in unique])
+    idx, sigs = minhash_many(flat, offsets, sizes)
+    # collapse each band of rows into one integer bucket key
+    rows = NUM_PERM // BANDS
+    band_keys = (sigs.reshape(len(idx), BANDS, rows) * _BAND_MIX).sum(axis=2).tolist()
+    keys_of = dict(zip(idx.tolist(), band_keys))
+
+    sets = {}
+    def shingle_set(i):
+        if i not in sets:
+            sets[i] = set(flat[offsets[i]:offsets[i] + sizes[i]].tolist())
+        return sets[i]
+
+    buckets = {}
+    out = []
+    for i, p in enumerate(unique):
+        keys = keys_of.get(i)
+        if keys is not None:
+            candidates = set()
+            for band in enumerate(keys):
+                candidates.update(buckets.get(band, ()))
+            if candidates and any(_jaccard(shingle_set(i), shingle_set(c)) >= threshold for c in candidates):
+                continue
+            for band in enumerate(keys):
+                buckets.setdefault(band, []).append(i)
+        out.append(p)
+    return out
+
+def _dedupe_exact(papers):
     seen = set()
     out = []
     for p in papers:
@@ -0,0 +1,114 @@
+"""
+Local arXiv Atom stub for benchmarks and self-checks. Answers any
+/api/query request with a synthetic feed built from search_query, start and
+max_results, counts the requests it served (`server.hits`) and can be told
+to fail (`server.fail = True` answers 503).
+
+    python scripts/arxiv_stub.py --port 8765 --latency 0.05
+    ARXIV_API_URL=http://127.0.0.1:8765/api/query uvicorn api.main:app
+"""
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+
+WORDS = (
+    "adaptive sparse graph kernel attention contrastive diffusion latent causal robust "
+    "bayesian federated spectral hierarchical variational neural symbolic temporal "
+    "equivariant stochastic convex transformer retrieval inference embedding policy "
+    "gradient manifold tensor quantum molecular protein language vision audio control "
+    "optimization generalization calibration uncertainty distillation pruning scaling "
+    "benchmark dataset pretraining alignment reasoning planning memory compression"
+).split()
+
+
+def _text(rnd: random.Random, n_words: int) -> str:
+    return " ".join(rnd.choice(WORDS) for _ in range(n_words))
+
+
+def _atom_feed(query: str, start: int, n: int) -> bytes:
+    entries = []
+    for i in range(start, start + n):
+        # seeded per (query, i): the same request gets the same feed, and
+        # entries differ enough that near-duplicate removal keeps them all
+        rnd = random.Random(f"{query}/{i}")
+        title = f"{query}: {_text(rnd, 6)}"
+        abstract = f"{_text(rnd, 25)}. {_text(rnd, 20)}."
+        entries.append(
+            "<entry>"
+            f"<id>http://arxiv.org/abs/2401.{i:05d}v1</id>"
+            f"<title>{escape(title)}</title>"
+            "<published>2024-01-15T00:00:00Z</published>"
+            f"<summary>{escape(abstract)}</summary>"
+            "<author><name>Ada Lovelace</name></author><author><name>Alan Turing</name></author>"
+            f'<link href="http://arxiv.org/abs/2401.{i:05d}v1" rel="alternate" type="text/html"/>'
+            "</entry>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+        f"<opensearch:totalResults>{start + n}</opensearch:totalResults>"
+        + "".join(entries) + "</feed>"
+    ).encode()
+
+
+def start_arxiv_stub(latency_s: float = 0.0, port: int = 0):
+    """
+    Serves the stub from a daemon thread; port 0 picks a free port
+    (see server.server_address). Call server.shutdown() to stop it.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with server.lock:
+                server.hits += 1
+            if latency_s:
+                time.sleep(latency_s)
+            if server.fail:
+                self.send_error(503)
+                return
+            qs = parse_qs(urlparse(self.path).query)
+            query = qs.get("search_query", [""])[0]
+            body = _atom_feed(query, int(qs.get("start", ["0"])[0]), int(qs.get("max_results", ["12"])[0]))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/atom+xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    server.hits = 0
+    server.fail = False
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stub_url(server) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}/api/query"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0, help="response delay (s)")
+    args = ap.parse_args()
+
+    server = start_arxiv_stub(args.latency, args.port)
+    print(f"arXiv stub on {stub_url(server)}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Compares parse_arxiv_atom (ET.fromstring + findall) with the streaming
+iter_arxiv_atom parser on large generated Atom pages.
+
+    python scripts/bench_atom_parser.py --entries 1000 2000 10000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from retrieval.arxiv_client import parse_arxiv_atom, iter_arxiv_atom
+
+ENTRY = """  <entry>
+    <id>http://arxiv.org/abs/2401.{i:05d}v1</id>
+    <published>2024-01-{day:02d}T00:00:00Z</published>
+    <title>Synthetic paper {i} on federated
+      learning and privacy</title>
+    <summary>{abstract}</summary>
+{authors}
+    <link href="http://arxiv.org/abs/2401.{i:05d}v1" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/2401.{i:05d}v1" rel="related" type="application/pdf"/>
+    <category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>
+"""
+
+
+def write_fixture(path, n):
+    abstract = " ".join(["We study heterogeneous clients under differential privacy constraints."] * 25)
+    with open(path, "w") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">\n')
+        f.write("  <title>ArXiv Query</title>\n")
+        for i in range(n):
+            authors = "\n".join(f"    <author><name>Author {i}-{j}</name></author>" for j in range(8))
+            f.write(ENTRY.format(i=i, day=i % 28 + 1, abstract=abstract, authors=authors))
+        f.write("</feed>\n")
+
+
+def measure(fn, repeat=3):
+    # timing runs without tracemalloc, which would otherwise dominate
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        count = fn()
+        times.append(time.perf_counter() - t0)
+
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"entries": count, "seconds": round(min(times), 4), "peak_mb": round(peak / 2**20, 2)}
+
+
+def bench(path):
+    def current():
+        with open(path, encoding="utf-8") as f:
+            return len(parse_arxiv_atom(f.read()))
+
+    def streaming():
+        # consume without keeping the records, as a corpus builder would
+        with open(path, "rb") as f:
+            return sum(1 for _ in iter_arxiv_atom(f))
+
+    # both parsers must agree record for record
+    with open(path, "rb") as fb, open(path, encoding="utf-8") as ft:
+        assert list(iter_arxiv_atom(fb)) == parse_arxiv_atom(ft.read())
+
+    return {"parse_arxiv_atom": measure(current), "iter_arxiv_atom": measure(streaming)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--entries", type=int, nargs="+", default=[1000, 2000, 10000])
+    ap.add_argument("--fixtures-dir", default=None, help="reuse/keep fixture files here")
+    args = ap.parse_args()
+
+    fixtures = args.fixtures_dir or tempfile.mkdtemp(prefix="atom-fixtures-")
+    os.makedirs(fixtures, exist_ok=True)
+
+    results = []
+    for n in args.entries:
+        path = os.path.join(fixtures, f"arxiv_{n}.xml")
+        if not os.path.exists(path):
+            write_fixture(path, n)
+        row = {"entries": n, "file_mb": round(os.path.getsize(path) / 2**20, 2)}
+        row.update(bench(path))
+        results.append(row)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
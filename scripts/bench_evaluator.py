@@ -0,0 +1,95 @@
+"""
+Times evaluate_batch against a loop over evaluate_summary on synthetic
+archived runs (summaries of ~800 paragraph words that mention most of their
+papers' titles, papers drawn from a shared corpus so titles recur across
+runs) and checks both give the same scores.
+
+    python scripts/bench_evaluator.py --runs 5000 --papers 5 10 30 100
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.evaluator import SECTIONS, evaluate_batch, evaluate_summary
+
+SYLLABLES = ["ra", "to", "ne", "ml", "graph", "lin", "ver", "quan", "sta", "ble", "tion", "op", "ex", "dif", "fu", "sion"]
+
+
+def make_vocab(n, rnd):
+    vocab = set()
+    while len(vocab) < n:
+        vocab.add("".join(rnd.choices(SYLLABLES, k=rnd.randint(1, 4))))
+    return sorted(vocab)
+
+
+def make_runs(n_runs, n_papers, corpus_size, seed=0):
+    rnd = random.Random(seed)
+    vocab = make_vocab(5000, rnd)
+    corpus = [
+        {"title": " ".join(rnd.choices(vocab, k=rnd.randint(6, 12))).capitalize()}
+        for _ in range(corpus_size)
+    ]
+    runs = []
+    for _ in range(n_runs):
+        papers = rnd.sample(corpus, n_papers)
+        mentioned = [p["title"] for p in papers if rnd.random() < 0.7]
+        words = rnd.choices(vocab, k=rnd.randint(600, 900))
+        for title in mentioned:
+            for w in title.split()[:4]:
+                words.insert(rnd.randrange(len(words) + 1), w)
+        cut = sorted(rnd.sample(range(1, len(words)), 3))
+        paragraphs = [" ".join(words[a:b]) for a, b in zip([0] + cut, cut + [len(words)])]
+        summary = {"paragraphs": paragraphs}
+        for sec in SECTIONS:
+            if rnd.random() < 0.9:
+                summary[sec] = [" ".join(rnd.choices(vocab, k=rnd.randint(8, 20))) for _ in range(rnd.randint(2, 5))]
+        runs.append((summary, papers))
+    return runs
+
+
+def _best(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--runs", type=int, default=5000)
+    ap.add_argument("--papers", type=int, nargs="+", default=[5, 10, 30, 100])
+    ap.add_argument("--corpus", type=int, default=20000, help="distinct papers the runs draw from")
+    ap.add_argument("--repeat", type=int, default=3, help="best of this many timings")
+    args = ap.parse_args()
+
+    results = []
+    for n_papers in args.papers:
+        runs = make_runs(args.runs, n_papers, args.corpus)
+        summaries = [s for s, _ in runs]
+        papers_list = [p for _, p in runs]
+        loop_s, expected = _best(lambda: [evaluate_summary(s, p) for s, p in runs], args.repeat)
+        batch_s, scores = _best(lambda: evaluate_batch(summaries, papers_list, as_frame=False), args.repeat)
+        identical = all(
+            {k: float(scores[k][i]) for k in e} == e for i, e in enumerate(expected)
+        )
+        results.append({
+            "runs": args.runs,
+            "papers": n_papers,
+            "loop_s": round(loop_s, 3),
+            "batch_s": round(batch_s, 3),
+            "speedup": round(loop_s / batch_s, 2),
+            "identical": identical,
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Stage-level pipeline benchmark against a local arXiv Atom stub and the mock
+LLM provider (with simulated latency / token rate). Reports p50/p95/p99
+latency and throughput per stage and concurrency level as JSON.
+
+    python scripts/bench_pipeline.py --concurrency 1 4 16 --requests 32 \
+        --llm-latency 0.2 --llm-tps 200 --arxiv-latency 0.05 --out bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scripts.arxiv_stub import start_arxiv_stub, stub_url
+
+STAGES = ("plan_query", "fetch_papers", "make_summary", "evaluate_summary", "endpoint")
+
+
+# ---------- measurement ----------
+def _summarize(latencies, wall_s):
+    import numpy as np
+
+    arr = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "mean_ms": round(float(arr.mean()), 2),
+        "throughput_rps": round(len(latencies) / wall_s, 2) if wall_s else None,
+    }
+
+
+async def _measure(fn, n_requests, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with sem:
+            t = time.perf_counter()
+            await fn(i)
+            latencies.append(time.perf_counter() - t)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n_requests)))
+    return _summarize(latencies, time.perf_counter() - t0)
+
+
+async def run(args):
+    import httpx
+
+    from agents.evaluator import evaluate_summary
+    from agents.planner import aplan_query
+    from agents.retriever import afetch_papers
+    from agents.summarizer import amake_summary
+    from api.main import app
+    from retrieval.arxiv_client import OFFLINE_URL
+
+    # a different query per request so no cache or request coalescing helps
+    def query(i):
+        return f"benchmark topic {i} graph learning"
+
+    papers = await afetch_papers({"keywords": query(0).split()}, n=args.n_papers)
+    if not papers or papers[0].get("url") == OFFLINE_URL:
+        raise SystemExit("arXiv stub not reached; got the offline fallback")
+    if len(papers) != args.n_papers:
+        raise SystemExit(f"expected {args.n_papers} papers from the stub, got {len(papers)}")
+    summary = await amake_summary(papers, use_cache=False)
+
+    async def evaluate(i):
+        evaluate_summary(summary, papers)
+
+    stages = {
+        "plan_query": lambda i: aplan_query(query(i), use_cache=False, mode=args.planner),
+        "fetch_papers": lambda i: afetch_papers({"keywords": query(i).split()}, n=args.n_papers),
+        "make_summary": lambda i: amake_summary(papers, use_cache=False),
+        "evaluate_summary": evaluate,
+    }
+
+    results = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=600) as client:
+        async def endpoint(i):
+            r = await client.post("/api/summarize", json={
+                "query": query(i), "n_papers": args.n_papers, "use_cache": False, "planner": args.planner,
+            })
+            r.raise_for_status()
+
+        stages["endpoint"] = endpoint
+        for name in args.stages:
+            results[name] = {}
+            for c in args.concurrency:
+                results[name][str(c)] = await _measure(stages[name], args.requests, c)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    ap.add_argument("--requests", type=int, default=32, help="requests per stage and concurrency level")
+    ap.add_argument("--stages", nargs="+", default=list(STAGES), choices=STAGES)
+    ap.add_argument("--n-papers", type=int, default=8)
+    ap.add_argument("--planner", default="llm", choices=["llm", "local"])
+    ap.add_argument("--llm-latency", type=float, default=0.2, help="mock LLM time to first token (s)")
+    ap.add_argument("--llm-tps", type=float, default=200.0, help="mock LLM tokens/s (0 = instant)")
+    ap.add_argument("--llm-concurrency", type=int, default=0, help="governor slots for the mock (0 = unlimited)")
+    ap.add_argument("--arxiv-latency", type=float, default=0.05, help="stub arXiv response delay (s)")
+    ap.add_argument("--out", default=None, help="also write the JSON report to this file")
+    args = ap.parse_args()
+
+    stub = start_arxiv_stub(args.arxiv_latency)
+    # settings are read from the environment at import time
+    os.environ.update({
+        "LLM_PROVIDER": "mock",
+        "MOCK_LLM_LATENCY_S": str(args.llm_latency),
+        "MOCK_LLM_TOKENS_PER_S": str(args.llm_tps),
+        "LLM_CONCURRENCY_MOCK": str(args.llm_concurrency),
+        "ARXIV_API_URL": stub_url(stub),
+        "ARXIV_CACHE_ENABLED": "false",
+        "LLM_CACHE_ENABLED": "false",
+        "LOCAL_INDEX_ENABLED": "false",
+        "TRACKING_ENABLED": "false",
+        "EVAL_WORKERS": "0",
+        "JOB_WORKERS": "0",
+    })
+
+    results = asyncio.run(run(args))
+    stub.shutdown()
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k != "out"},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Cold-start benchmark for the API process: time to import api.main, to
+finish the FastAPI startup phase and to pass the warm-up that gates
+GET /ready, each run in a fresh interpreter with the mock provider and no
+model-backed features (EVAL_MODEL_METRICS, LOCAL_INDEX_ENABLED). Exits 1
+when the median time from launch until /ready is green (ready_s) is over
+budget or a heavy dependency was loaded before the startup phase finished.
+
+    python scripts/bench_startup.py --runs 5 --budget 1.0
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# loaded on first use, never by importing or starting the app
+HEAVY = ("litellm", "mlflow", "sentence_transformers", "torch", "bert_score", "pandas")
+
+_CHILD = """
+import asyncio, json, sys, time
+HEAVY = %r
+t0 = time.perf_counter()
+from api.main import app
+t1 = time.perf_counter()
+
+async def main():
+    from agents.warmup import readiness
+
+    async with app.router.lifespan_context(app):
+        t2 = time.perf_counter()
+        heavy = [m for m in HEAVY if m in sys.modules]
+        while not readiness()["ready"]:
+            await asyncio.sleep(0.01)
+        t3 = time.perf_counter()
+        print(json.dumps({
+            "import_s": t1 - t0,
+            "startup_s": t2 - t1,
+            "warmup_s": t3 - t2,
+            "ready_s": t3 - t0,
+            "heavy": heavy,
+        }), flush=True)
+
+asyncio.run(main())
+""" % (HEAVY,)
+
+
+def run_once(env):
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120
+    )
+    for line in out.stdout.splitlines():
+        if line.startswith("{"):
+            return json.loads(line)
+    raise SystemExit(f"startup run failed:\n{out.stderr[-2000:]}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--budget", type=float, default=1.0, help="max median seconds from launch until /ready is green")
+    args = ap.parse_args()
+
+    # the budget covers the app itself: no scoring encoder or embedding model
+    # load in warm-up, whatever the local .env turns on
+    env = {
+        **os.environ,
+        "PYTHONPATH": ROOT,
+        "LLM_PROVIDER": "mock",
+        "EVAL_MODEL_METRICS": "false",
+        "LOCAL_INDEX_ENABLED": "false",
+    }
+    runs = [run_once(env) for _ in range(args.runs)]
+
+    report = {
+        key: {
+            "median": round(statistics.median(r[key] for r in runs), 3),
+            "max": round(max(r[key] for r in runs), 3),
+        }
+        for key in ("import_s", "startup_s", "warmup_s", "ready_s")
+    }
+    heavy = sorted({m for r in runs for m in r["heavy"]})
+    report["heavy_modules_loaded"] = heavy
+    report["budget_s"] = args.budget
+    report["ok"] = report["ready_s"]["median"] <= args.budget and not heavy
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
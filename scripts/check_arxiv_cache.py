@@ -0,0 +1,140 @@
+"""
+Self-check for the arXiv query cache against the local stub: drives
+search_arxiv and asearch_arxiv through miss, fresh hit, stale-while-
+revalidate, expiry and an upstream failure, counting the requests the stub
+actually served. Prints a JSON report and exits 1 if any check fails.
+
+    python scripts/check_arxiv_cache.py --ttl 0.5 --stale 1.0
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scripts.arxiv_stub import start_arxiv_stub, stub_url
+
+
+def _check(results, mode, name, ok, **detail):
+    results.append({"mode": mode, "check": name, "ok": bool(ok), **detail})
+
+
+def check_sync(stub, args, results):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from retrieval.arxiv_client import OFFLINE_URL, search_arxiv
+
+    def call(query):
+        before = stub.hits
+        t = time.perf_counter()
+        papers = search_arxiv(query)
+        return papers, stub.hits - before, time.perf_counter() - t
+
+    query = "sync cache check"
+    papers, hits, _ = call(query)
+    _check(results, "sync", "miss fetches", hits == 1 and papers[0]["url"] != OFFLINE_URL, stub_hits=hits)
+    again, hits, elapsed = call(query)
+    _check(results, "sync", "fresh hit", hits == 0 and again == papers, stub_hits=hits, ms=round(elapsed * 1000, 2))
+
+    time.sleep(args.ttl + 0.1)
+    before = stub.hits
+    t = time.perf_counter()
+    with ThreadPoolExecutor(8) as pool:
+        stale = list(pool.map(search_arxiv, [query] * 8))
+    elapsed = time.perf_counter() - t
+    _check(results, "sync", "stale served without waiting",
+           all(s == papers for s in stale) and elapsed < args.latency, ms=round(elapsed * 1000, 2))
+    time.sleep(args.latency + 0.3)
+    _check(results, "sync", "one background refresh", stub.hits - before == 1, stub_hits=stub.hits - before)
+    _, hits, _ = call(query)
+    _check(results, "sync", "refreshed entry is fresh", hits == 0, stub_hits=hits)
+
+    time.sleep(args.ttl + args.stale + 0.1)
+    _, hits, _ = call(query)
+    _check(results, "sync", "expired refetches", hits == 1, stub_hits=hits)
+
+    time.sleep(args.ttl + args.stale + 0.1)
+    stub.fail = True
+    try:
+        fallback, hits, _ = call(query)
+    finally:
+        stub.fail = False
+    _check(results, "sync", "expired entry served on upstream error", hits == 1 and fallback == papers, stub_hits=hits)
+
+
+async def check_async(stub, args, results):
+    from retrieval.arxiv_client import OFFLINE_URL, aclose_client, asearch_arxiv
+
+    async def call(query):
+        before = stub.hits
+        t = time.perf_counter()
+        papers = await asearch_arxiv(query)
+        return papers, stub.hits - before, time.perf_counter() - t
+
+    query = "async cache check"
+    papers, hits, _ = await call(query)
+    _check(results, "async", "miss fetches", hits == 1 and papers[0]["url"] != OFFLINE_URL, stub_hits=hits)
+    again, hits, elapsed = await call(query)
+    _check(results, "async", "fresh hit", hits == 0 and again == papers, stub_hits=hits, ms=round(elapsed * 1000, 2))
+
+    await asyncio.sleep(args.ttl + 0.1)
+    before = stub.hits
+    t = time.perf_counter()
+    stale = await asyncio.gather(*(asearch_arxiv(query) for _ in range(8)))
+    elapsed = time.perf_counter() - t
+    _check(results, "async", "stale served without waiting",
+           all(s == papers for s in stale) and elapsed < args.latency, ms=round(elapsed * 1000, 2))
+    await asyncio.sleep(args.latency + 0.3)
+    _check(results, "async", "one background refresh", stub.hits - before == 1, stub_hits=stub.hits - before)
+    _, hits, _ = await call(query)
+    _check(results, "async", "refreshed entry is fresh", hits == 0, stub_hits=hits)
+
+    await asyncio.sleep(args.ttl + args.stale + 0.1)
+    _, hits, _ = await call(query)
+    _check(results, "async", "expired refetches", hits == 1, stub_hits=hits)
+
+    await asyncio.sleep(args.ttl + args.stale + 0.1)
+    stub.fail = True
+    try:
+        fallback, hits, _ = await call(query)
+    finally:
+        stub.fail = False
+    _check(results, "async", "expired entry served on upstream error", hits == 1 and fallback == papers, stub_hits=hits)
+    await aclose_client()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--ttl", type=float, default=0.5, help="ARXIV_CACHE_TTL_S for the check (s)")
+    ap.add_argument("--stale", type=float, default=1.0, help="ARXIV_CACHE_STALE_S for the check (s)")
+    ap.add_argument("--latency", type=float, default=0.3, help="stub response delay (s)")
+    args = ap.parse_args()
+
+    stub = start_arxiv_stub(args.latency)
+    tmp = tempfile.mkdtemp(prefix="arxiv-cache-check-")
+    # settings are read from the environment at import time
+    os.environ.update({
+        "ARXIV_API_URL": stub_url(stub),
+        "ARXIV_CACHE_ENABLED": "true",
+        "ARXIV_CACHE_PATH": os.path.join(tmp, "arxiv_cache.sqlite"),
+        "ARXIV_CACHE_TTL_S": str(args.ttl),
+        "ARXIV_CACHE_STALE_S": str(args.stale),
+    })
+
+    results = []
+    check_sync(stub, args, results)
+    asyncio.run(check_async(stub, args, results))
+    stub.shutdown()
+
+    report = {"stub_requests": stub.hits, "checks": results, "ok": all(r["ok"] for r in results)}
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
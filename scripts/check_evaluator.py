@@ -0,0 +1,110 @@
+"""
+Self-check for agents/evaluator.evaluate_batch: scores randomized summaries
+and paper lists with both evaluate_batch and evaluate_summary and exits 1
+unless every score matches exactly. Cases cover both coverage paths (direct
+substring test and the word index), title tokens hidden inside longer
+words, missing or non-list sections and empty paper lists.
+
+    python scripts/check_evaluator.py --cases 2000 --seed 0
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.evaluator import INDEX_MIN_TOKENS, SECTIONS, _title_tokens, evaluate_batch, evaluate_summary
+
+WORDS = [
+    "graph", "graphs", "neural", "networks", "network", "learning", "federated", "privacy",
+    "transformer", "transformers", "attention", "diffusion", "models", "robust", "robustness",
+    "scalable", "sparse", "sparsity", "quantum", "optimization", "kernel", "kernels", "data",
+    "on", "of", "for", "a", "the", "with", "via", "deep", "bayesian", "inference", "causal",
+]
+
+
+def _word(rnd):
+    w = rnd.choice(WORDS)
+    roll = rnd.random()
+    if roll < 0.15:
+        # glued words: title tokens must match inside them
+        w += rnd.choice(WORDS)
+    elif roll < 0.25:
+        w = w.upper()
+    return w
+
+
+def _text(rnd, lo, hi):
+    return " ".join(_word(rnd) for _ in range(rnd.randint(lo, hi)))
+
+
+def make_case(rnd):
+    n_papers = rnd.choice([0, 1, 3, 8, 40])
+    papers = []
+    for _ in range(n_papers):
+        roll = rnd.random()
+        if roll < 0.05:
+            papers.append({})
+        elif roll < 0.1:
+            papers.append({"title": None})
+        else:
+            papers.append({"title": _text(rnd, 1, 8)})
+
+    summary = {}
+    if rnd.random() > 0.05:
+        # paragraph lengths around the depth curve, including long ones
+        summary["paragraphs"] = [_text(rnd, 0, rnd.choice([20, 200, 900])) for _ in range(rnd.randint(0, 4))]
+    for sec in SECTIONS:
+        roll = rnd.random()
+        if roll < 0.2:
+            continue
+        if roll < 0.3:
+            summary[sec] = []
+        elif roll < 0.35:
+            summary[sec] = "not a list"
+        else:
+            summary[sec] = [_text(rnd, 1, 12) for _ in range(rnd.randint(1, 5))]
+    return summary, papers
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--cases", type=int, default=2000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rnd = random.Random(args.seed)
+    cases = [make_case(rnd) for _ in range(args.cases)]
+    summaries = [s for s, _ in cases]
+    papers_list = [p for _, p in cases]
+
+    batch = evaluate_batch(summaries, papers_list, as_frame=False)
+    frame = evaluate_batch(summaries, papers_list)
+    mismatches = []
+    for i, (summary, papers) in enumerate(cases):
+        expected = evaluate_summary(summary, papers)
+        got = {k: float(batch[k][i]) for k in expected}
+        from_frame = {k: float(frame[k].iloc[i]) for k in expected}
+        if got != expected or from_frame != expected:
+            mismatches.append({"case": i, "expected": expected, "got": got})
+
+    indexed = sum(
+        len({t for p in papers for t in _title_tokens(p)}) > INDEX_MIN_TOKENS
+        for papers in papers_list
+    )
+    report = {
+        "cases": len(cases),
+        "seed": args.seed,
+        "word_index_cases": indexed,
+        "mismatches": len(mismatches),
+        "first_mismatches": mismatches[:5],
+        "ok": not mismatches,
+    }
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
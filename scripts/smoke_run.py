@@ -1,7 +1,17 @@
 
-import requests, json
+import requests, json, time
 
 payload = {"query":"federated learning in healthcare","n_papers":6,"sources":["arxiv"]}
-r = requests.post("http://localhost:8000/api/summarize", json=payload, timeout=120)
-print(r.status_code)
-print(json.dumps(r.json(), indent=2)[:4000])
+r = requests.post("http://localhost:8000/api/jobs", json=payload, timeout=30)
+r.raise_for_status()
+job_id = r.json()["job_id"]
+
+# poll until the worker is done; slow local models can take minutes
+while True:
+    job = requests.get(f"http://localhost:8000/api/jobs/{job_id}", timeout=30).json()
+    print(job["status"], job.get("progress"))
+    if job["status"] in ("done", "failed"):
+        break
+    time.sleep(2)
+
+print(json.dumps(job.get("result") or job, indent=2)[:4000])
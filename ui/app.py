@@ -1,11 +1,26 @@
 import streamlit as st
 import requests
 import os
+import threading
 import time
+from collections import OrderedDict
 
 # Base API URL
 API_URL = os.getenv("API_URL", "http://localhost:8000")
-api_url = f"{API_URL}/api/summarize"
+jobs_url = f"{API_URL}/api/jobs"
+
+POLL_S = float(os.getenv("UI_POLL_S", "1.0"))
+RESULT_CACHE_SIZE = int(os.getenv("UI_RESULT_CACHE_SIZE", "64"))  # shared by all sessions
+SESSION_CACHE_SIZE = 16
+
+# job progress -> progress bar position and label
+STAGES = {
+    "queued": (5, "⏳ Waiting for a worker..."),
+    "planning": (15, "🧭 Planning the literature search..."),
+    "retrieving": (35, "📡 Fetching research papers from ArXiv..."),
+    "summarizing": (60, "🤖 AI is analyzing the papers..."),
+    "evaluating": (90, "✨ Scoring the summary..."),
+}
 
 st.set_page_config(
     page_title="Research Summarizer AI",
@@ -268,284 +283,387 @@ with col2:
         help="More papers = deeper analysis but slower processing"
     )
 
-# ------------------- SUBMIT -------------------
-st.markdown("<br>", unsafe_allow_html=True)
 
-col_btn1, col_btn2, col_btn3 = st.columns([1, 2, 1])
-with col_btn2:
-    generate_btn = st.button("🚀 Generate AI Summary", use_container_width=True)
+# ------------------- API + CACHE HELPERS -------------------
+class LRU:
+    """Small thread-safe LRU of finished results."""
 
-if generate_btn and topic:
-    st.session_state.search_count += 1
-    
-    # Progress bar with stages
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
+    def __init__(self, size):
+        self.size = size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+
+@st.cache_resource
+def get_session():
+    """One pooled keep-alive HTTP session for every rerun and browser session."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_resource
+def shared_results():
+    """Finished results across all sessions of this UI process."""
+    return LRU(RESULT_CACHE_SIZE)
+
+
+def result_key(topic, n_papers, sources):
+    return (" ".join(topic.lower().split()), n_papers, tuple(sorted(sources)))
+
+
+def cached_result(key):
+    result = st.session_state.results.get(key)
+    if result is None:
+        result = shared_results().get(key)
+        if result is not None:
+            st.session_state.results.put(key, result)
+    return result
+
+
+def start(key, topic, n_papers, sources):
+    """
+    Shows the result for `key`: from a cache, from a job already running
+    for it, or from a newly submitted job. Never blocks on the pipeline.
+    """
+    st.session_state.current = key
+    st.session_state.topics[key] = topic
+    st.session_state.errors.pop(key, None)
+    if cached_result(key) is not None or key in st.session_state.jobs:
+        return
+    r = get_session().post(
+        jobs_url, json={"query": topic, "n_papers": n_papers, "sources": list(sources)}, timeout=10
+    )
+    if r.status_code == 503:
+        wait = r.headers.get("Retry-After", "a few")
+        st.session_state.errors[key] = f"The server is busy, try again in {wait}s."
+        return
+    r.raise_for_status()
+    st.session_state.jobs[key] = r.json()["job_id"]
+
+
+@st.fragment(run_every=POLL_S)
+def job_progress(key):
+    """
+    Polls the job for `key` and renders its partial results (plan, papers,
+    summary text) as they arrive; only this fragment reruns while pending.
+    """
+    job_id = st.session_state.jobs.get(key)
+    if job_id is None:
+        return
     try:
-        # Stage 1: Fetching papers
-        status_text.markdown("### 📡 Fetching research papers from ArXiv...")
-        progress_bar.progress(25)
-        time.sleep(0.5)
-        
-        # Stage 2: Processing
-        status_text.markdown("### 🤖 AI is analyzing papers...")
-        progress_bar.progress(50)
-        
-            resp = requests.post(
-                api_url,
-                json={"query": topic, "n_papers": n_papers, "sources": ["arxiv"]},
-                timeout=180
-            )
-
-            if resp.status_code != 200:
-            st.error(f"❌ Server Error: {resp.text}")
-                st.stop()
-
-        # Stage 3: Generating summary
-        status_text.markdown("### ✨ Generating comprehensive summary...")
-        progress_bar.progress(75)
-        time.sleep(0.5)
-
-        data = resp.json()
-        summary = data.get("summary", {}) or {}
-        scores = data.get("eval", {}) or {}
-        papers = data.get("papers", []) or []
-
-        # Stage 4: Complete
-        progress_bar.progress(100)
-        status_text.empty()
-        progress_bar.empty()
-        
-        st.balloons()
-        st.success(f"✅ Successfully analyzed {len(papers)} research papers on **{topic}**!")
+        r = get_session().get(f"{jobs_url}/{job_id}", timeout=10)
+        r.raise_for_status()
+        job = r.json()
+    except requests.exceptions.RequestException as e:
+        st.warning(f"⚠️ Waiting for the API: {e}")
+        return
+
+    if job["status"] == "done":
+        shared_results().put(key, job["result"])
+        st.session_state.results.put(key, job["result"])
+        st.session_state.jobs.pop(key, None)
+        st.session_state.celebrate = key
+        st.rerun()
+    elif job["status"] == "failed":
+        st.session_state.jobs.pop(key, None)
+        st.session_state.errors[key] = job.get("error") or "The job failed."
+        st.rerun()
+
+    pct, label = STAGES.get(job.get("progress") or job["status"], STAGES["queued"])
+    partial = job.get("partial") or {}
+    papers = partial.get("papers") or []
+    streamed = partial.get("summary_text") or ""
+    if papers and job.get("progress") == "summarizing":
+        label = f"🤖 AI is analyzing {len(papers)} papers..."
+        pct = min(85, pct + len(streamed) // 100)
+
+    st.markdown(f"### {label}")
+    st.progress(pct)
+    started = job.get("started_at") or job["created_at"]
+    st.caption(f"Job {job_id[:8]} · {job['status']} · {time.time() - started:.0f}s")
+
+    # sections appear as the worker reports them
+    if partial.get("plan"):
+        keywords = ", ".join(partial["plan"].get("keywords") or [])
+        st.markdown(f"**🧭 Search plan:** {keywords or st.session_state.topics.get(key, key[0])}")
+    if papers:
+        st.markdown("\n".join(
+            f"- 📄 {p.get('title', 'Untitled')} ({p.get('year', 'N/A')})" for p in papers
+        ))
+    if streamed:
+        st.code(streamed[-3000:], language="json")
+
+
+def render_results(topic, summary, scores, papers):
+    # ------------------- TABS -------------------
+    tab_summary, tab_details, tab_papers, tab_insights = st.tabs(
+        ["📘 Summary", "🔬 Details & Findings", "📚 Papers", "💡 Insights"]
+    )
+
+    # ===== TAB: SUMMARY =====
+    with tab_summary:
+        st.markdown('<div class="section-header">📊 Quality Metrics</div>', unsafe_allow_html=True)
+
+        # Evaluation metrics with improved styling
+        col1, col2, col3, col4 = st.columns(4)
+
+        metrics = [
+            ("Overall Score", scores.get('overall') or 0, "🎯"),
+            ("Coverage", scores.get('coverage') or 0, "📊"),
+            ("Depth", scores.get('depth') or 0, "🔍"),
+            ("Structure", scores.get('structure') or 0, "📐")
+        ]
+
+        for col, (label, value, icon) in zip([col1, col2, col3, col4], metrics):
+            with col:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <div style="font-size: 2rem;">{icon}</div>
+                    <div style="font-size: 2rem; font-weight: 700; color: #667eea; margin: 0.5rem 0;">
+                        {value:.1f}
+                    </div>
+                    <div style="color: #a8b2d1; font-size: 0.9rem;">{label}</div>
+                </div>
+                """, unsafe_allow_html=True)
 
         st.markdown("<br>", unsafe_allow_html=True)
 
-            # ------------------- TABS -------------------
-        tab_summary, tab_details, tab_papers, tab_insights = st.tabs(
-            ["📘 Summary", "🔬 Details & Findings", "📚 Papers", "💡 Insights"]
-            )
-
-            # ===== TAB: SUMMARY =====
-            with tab_summary:
-                st.markdown('<div class="section-header">📊 Quality Metrics</div>', unsafe_allow_html=True)
-                
-                # Evaluation metrics with improved styling
-                col1, col2, col3, col4 = st.columns(4)
-                
-                metrics = [
-                    ("Overall Score", scores.get('overall', 0), "🎯"),
-                    ("Coverage", scores.get('coverage', 0), "📊"),
-                    ("Depth", scores.get('depth', 0), "🔍"),
-                    ("Structure", scores.get('structure', 0), "📐")
-                ]
-                
-                for col, (label, value, icon) in zip([col1, col2, col3, col4], metrics):
-                    with col:
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div style="font-size: 2rem;">{icon}</div>
-                            <div style="font-size: 2rem; font-weight: 700; color: #667eea; margin: 0.5rem 0;">
-                                {value:.1f}
-                            </div>
-                            <div style="color: #a8b2d1; font-size: 0.9rem;">{label}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                
+        # Deep paragraphs with glass morphism
+        st.markdown('<div class="section-header">📘 Comprehensive Summary</div>', unsafe_allow_html=True)
+
+        paragraphs = summary.get("paragraphs", [])
+        if paragraphs:
+            for i, p in enumerate(paragraphs, 1):
+                st.markdown(f"""
+                <div class="glass-card">
+                    <h4 style="color: #667eea; margin-bottom: 1rem;">Section {i}</h4>
+                    <p style="color: #ccd6f6; line-height: 1.8; font-size: 1rem;">{p}</p>
+                </div>
+                """, unsafe_allow_html=True)
+        else:
+            st.info("No summary paragraphs available.")
+
+    # ===== TAB: DETAILS =====
+    with tab_details:
+        mapping = {
+            "🔬 Key Findings": ("key_findings", "#667eea"),
+            "🧪 Methods & Approaches": ("methods", "#48bb78"),
+            "✨ What's New": ("whats_new", "#ed8936"),
+            "🧩 Open Problems": ("open_problems", "#f56565"),
+            "⚠️ Limitations": ("limitations", "#ecc94b"),
+            "🚀 Future Research Directions": ("future_work", "#9f7aea"),
+        }
+
+        for title, (key, color) in mapping.items():
+            items = summary.get(key, [])
+            if items:
+                st.markdown(f'<div class="section-header" style="color: {color};">{title}</div>', unsafe_allow_html=True)
+
+                for i, item in enumerate(items, 1):
+                    st.markdown(f"""
+                    <div class="glass-card" style="border-left: 4px solid {color};">
+                        <p style="color: #ccd6f6; line-height: 1.6;">
+                            <strong style="color: {color};">{i}.</strong> {item}
+                        </p>
+                    </div>
+                    """, unsafe_allow_html=True)
+
                 st.markdown("<br>", unsafe_allow_html=True)
 
-                # Deep paragraphs with glass morphism
-                st.markdown('<div class="section-header">📘 Comprehensive Summary</div>', unsafe_allow_html=True)
-                
-                paragraphs = summary.get("paragraphs", [])
-                if paragraphs:
-                    for i, p in enumerate(paragraphs, 1):
-                        st.markdown(f"""
-                        <div class="glass-card">
-                            <h4 style="color: #667eea; margin-bottom: 1rem;">Section {i}</h4>
-                            <p style="color: #ccd6f6; line-height: 1.8; font-size: 1rem;">{p}</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                else:
-                    st.info("No summary paragraphs available.")
-
-            # ===== TAB: DETAILS =====
-            with tab_details:
-                mapping = {
-                "🔬 Key Findings": ("key_findings", "#667eea"),
-                "🧪 Methods & Approaches": ("methods", "#48bb78"),
-                "✨ What's New": ("whats_new", "#ed8936"),
-                "🧩 Open Problems": ("open_problems", "#f56565"),
-                "⚠️ Limitations": ("limitations", "#ecc94b"),
-                "🚀 Future Research Directions": ("future_work", "#9f7aea"),
-            }
-
-            for title, (key, color) in mapping.items():
-                items = summary.get(key, [])
-                if items:
-                    st.markdown(f'<div class="section-header" style="color: {color};">{title}</div>', unsafe_allow_html=True)
-                    
-                    for i, item in enumerate(items, 1):
-                        st.markdown(f"""
-                        <div class="glass-card" style="border-left: 4px solid {color};">
-                            <p style="color: #ccd6f6; line-height: 1.6;">
-                                <strong style="color: {color};">{i}.</strong> {item}
-                            </p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    st.markdown("<br>", unsafe_allow_html=True)
-            
-            if not any(summary.get(key, []) for _, (key, _) in mapping.items()):
-                st.info("Detailed analysis is not available in mock mode. Use a real LLM provider for comprehensive insights.")
-
-            # ===== TAB: PAPERS =====
-            with tab_papers:
-            st.markdown('<div class="section-header">⭐ Top Recommended Papers</div>', unsafe_allow_html=True)
-            
-            top_papers = summary.get("top5_papers", [])
-            if top_papers and top_papers[0].get('title') != 'Mock':
-                for i, paper in enumerate(top_papers, 1):
+        if not any(summary.get(key, []) for _, (key, _) in mapping.items()):
+            st.info("Detailed analysis is not available in mock mode. Use a real LLM provider for comprehensive insights.")
+
+    # ===== TAB: PAPERS =====
+    with tab_papers:
+        st.markdown('<div class="section-header">⭐ Top Recommended Papers</div>', unsafe_allow_html=True)
+
+        top_papers = summary.get("top5_papers", [])
+        if top_papers and top_papers[0].get('title') != 'Mock':
+            for i, paper in enumerate(top_papers, 1):
+                st.markdown(f"""
+                <div class="paper-card">
+                    <div style="color: #667eea; font-weight: 700; margin-bottom: 0.5rem;">
+                        #{i} RECOMMENDED
+                    </div>
+                    <h3 style="color: #ccd6f6; margin-bottom: 0.5rem;">
+                        <a href="{paper.get('url')}" target="_blank" style="color: #667eea; text-decoration: none;">
+                            {paper.get('title')} 🔗
+                        </a>
+                    </h3>
+                </div>
+                """, unsafe_allow_html=True)
+
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown('<div class="section-header">📚 All Retrieved Papers ({} total)</div>'.format(len(papers)), unsafe_allow_html=True)
+
+        for i, paper in enumerate(papers, 1):
+            with st.expander(f"📄 Paper {i}: {paper.get('title', 'Untitled')}", expanded=(i==1)):
+                col1, col2 = st.columns([3, 1])
+
+                with col1:
                     st.markdown(f"""
-                    <div class="paper-card">
-                        <div style="color: #667eea; font-weight: 700; margin-bottom: 0.5rem;">
-                            #{i} RECOMMENDED
-                        </div>
-                        <h3 style="color: #ccd6f6; margin-bottom: 0.5rem;">
-                            <a href="{paper.get('url')}" target="_blank" style="color: #667eea; text-decoration: none;">
-                                {paper.get('title')} 🔗
-                            </a>
-                        </h3>
+                    <div class="glass-card">
+                        <h4 style="color: #667eea; margin-bottom: 1rem;">
+                            {paper.get('title', 'Untitled')}
+                        </h4>
+                        <p style="color: #a8b2d1; margin-bottom: 0.5rem;">
+                            <strong>👥 Authors:</strong> {', '.join(paper.get('authors', [])[:5])}
+                            {'...' if len(paper.get('authors', [])) > 5 else ''}
+                        </p>
+                        <p style="color: #a8b2d1; margin-bottom: 1rem;">
+                            <strong>📅 Year:</strong> {paper.get('year', 'N/A')} | 
+                            <strong>📌 Source:</strong> {paper.get('source', 'ArXiv').upper()}
+                        </p>
+                        <p style="color: #ccd6f6; line-height: 1.6; margin-bottom: 1rem;">
+                            <strong style="color: #667eea;">Abstract:</strong><br>
+                            {paper.get('abstract', 'No abstract available.')[:500]}
+                            {'...' if len(paper.get('abstract', '')) > 500 else ''}
+                        </p>
+                        <a href="{paper.get('url', '#')}" target="_blank" 
+                           style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                                  color: white; padding: 0.5rem 1rem; border-radius: 8px; 
+                                  text-decoration: none; display: inline-block; font-weight: 600;">
+                            🔗 Read Full Paper
+                        </a>
                     </div>
                     """, unsafe_allow_html=True)
-            
-            st.markdown("<br>", unsafe_allow_html=True)
-            st.markdown('<div class="section-header">📚 All Retrieved Papers ({} total)</div>'.format(len(papers)), unsafe_allow_html=True)
-            
-            for i, paper in enumerate(papers, 1):
-                with st.expander(f"📄 Paper {i}: {paper.get('title', 'Untitled')}", expanded=(i==1)):
-                    col1, col2 = st.columns([3, 1])
-                    
-                    with col1:
-                        st.markdown(f"""
-                        <div class="glass-card">
-                            <h4 style="color: #667eea; margin-bottom: 1rem;">
-                                {paper.get('title', 'Untitled')}
-                            </h4>
-                            <p style="color: #a8b2d1; margin-bottom: 0.5rem;">
-                                <strong>👥 Authors:</strong> {', '.join(paper.get('authors', [])[:5])}
-                                {'...' if len(paper.get('authors', [])) > 5 else ''}
-                            </p>
-                            <p style="color: #a8b2d1; margin-bottom: 1rem;">
-                                <strong>📅 Year:</strong> {paper.get('year', 'N/A')} | 
-                                <strong>📌 Source:</strong> {paper.get('source', 'ArXiv').upper()}
-                            </p>
-                            <p style="color: #ccd6f6; line-height: 1.6; margin-bottom: 1rem;">
-                                <strong style="color: #667eea;">Abstract:</strong><br>
-                                {paper.get('abstract', 'No abstract available.')[:500]}
-                                {'...' if len(paper.get('abstract', '')) > 500 else ''}
-                            </p>
-                            <a href="{paper.get('url', '#')}" target="_blank" 
-                               style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                                      color: white; padding: 0.5rem 1rem; border-radius: 8px; 
-                                      text-decoration: none; display: inline-block; font-weight: 600;">
-                                🔗 Read Full Paper
-                            </a>
+
+                with col2:
+                    st.markdown(f"""
+                    <div style="text-align: center; padding: 1rem;">
+                        <div style="font-size: 3rem; margin-bottom: 0.5rem;">📄</div>
+                        <div style="color: #667eea; font-weight: 700; font-size: 2rem;">
+                            #{i}
                         </div>
-                        """, unsafe_allow_html=True)
-                    
-                    with col2:
-                        st.markdown(f"""
-                        <div style="text-align: center; padding: 1rem;">
-                            <div style="font-size: 3rem; margin-bottom: 0.5rem;">📄</div>
-                            <div style="color: #667eea; font-weight: 700; font-size: 2rem;">
-                                #{i}
-                            </div>
-                            <div style="color: #a8b2d1; font-size: 0.9rem;">
-                                of {len(papers)}
-                            </div>
+                        <div style="color: #a8b2d1; font-size: 0.9rem;">
+                            of {len(papers)}
                         </div>
-                        """, unsafe_allow_html=True)
-
-        # ===== TAB: INSIGHTS =====
-        with tab_insights:
-            st.markdown('<div class="section-header">💡 Quick Insights</div>', unsafe_allow_html=True)
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("""
-                <div class="glass-card">
-                    <h3 style="color: #667eea; margin-bottom: 1rem;">📊 Research Landscape</h3>
-                    <p style="color: #ccd6f6; line-height: 1.6;">
-                        This analysis covers <strong style="color: #667eea;">{}</strong> research papers
-                        on the topic of <strong style="color: #667eea;">"{}"</strong>.
-                    </p>
-                    <br>
-                    <p style="color: #a8b2d1;">
-                        📅 Publication Years: {} - {}<br>
-                        👥 Total Authors: {} (approx)<br>
-                        🌐 Source: ArXiv Database
-                    </p>
-                </div>
-                """.format(
-                    len(papers),
-                    topic,
-                    min((p.get('year', 2024) for p in papers if p.get('year')), default=2024),
-                    max((p.get('year', 2024) for p in papers if p.get('year')), default=2024),
-                    sum(len(p.get('authors', [])) for p in papers)
-                ), unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown("""
-                <div class="glass-card">
-                    <h3 style="color: #48bb78; margin-bottom: 1rem;">🎯 Summary Stats</h3>
-                    <p style="color: #ccd6f6; line-height: 1.6;">
-                        Generated {} summary sections with comprehensive analysis
-                        of current research trends and future directions.
-                    </p>
-                    <br>
-                    <p style="color: #a8b2d1;">
-                        ✨ What's New: {} insights<br>
-                        🧩 Open Problems: {} identified<br>
-                        🚀 Future Directions: {} suggested
-                    </p>
-                </div>
-                """.format(
-                    len(summary.get("paragraphs", [])),
-                    len(summary.get("whats_new", [])),
-                    len(summary.get("open_problems", [])),
-                    len(summary.get("future_work", []))
-                ), unsafe_allow_html=True)
-            
-            st.markdown("<br>", unsafe_allow_html=True)
-            
-            # Word cloud placeholder
+                    </div>
+                    """, unsafe_allow_html=True)
+
+    # ===== TAB: INSIGHTS =====
+    with tab_insights:
+        st.markdown('<div class="section-header">💡 Quick Insights</div>', unsafe_allow_html=True)
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("""
+            <div class="glass-card">
+                <h3 style="color: #667eea; margin-bottom: 1rem;">📊 Research Landscape</h3>
+                <p style="color: #ccd6f6; line-height: 1.6;">
+                    This analysis covers <strong style="color: #667eea;">{}</strong> research papers
+                    on the topic of <strong style="color: #667eea;">"{}"</strong>.
+                </p>
+                <br>
+                <p style="color: #a8b2d1;">
+                    📅 Publication Years: {} - {}<br>
+                    👥 Total Authors: {} (approx)<br>
+                    🌐 Source: ArXiv Database
+                </p>
+            </div>
+            """.format(
+                len(papers),
+                topic,
+                min((p.get('year', 2024) for p in papers if p.get('year')), default=2024),
+                max((p.get('year', 2024) for p in papers if p.get('year')), default=2024),
+                sum(len(p.get('authors', [])) for p in papers)
+            ), unsafe_allow_html=True)
+
+        with col2:
             st.markdown("""
             <div class="glass-card">
-                <h3 style="color: #9f7aea; margin-bottom: 1rem;">🔑 Key Takeaways</h3>
-                <ul style="color: #ccd6f6; line-height: 2;">
-                    <li>This research area is <strong style="color: #667eea;">actively evolving</strong> with {} recent papers</li>
-                    <li>Multiple research groups are working on <strong style="color: #667eea;">innovative solutions</strong></li>
-                    <li>Significant <strong style="color: #48bb78;">opportunities exist</strong> for future research</li>
-                    <li>The field shows <strong style="color: #ed8936;">high collaboration</strong> among researchers</li>
-                </ul>
+                <h3 style="color: #48bb78; margin-bottom: 1rem;">🎯 Summary Stats</h3>
+                <p style="color: #ccd6f6; line-height: 1.6;">
+                    Generated {} summary sections with comprehensive analysis
+                    of current research trends and future directions.
+                </p>
+                <br>
+                <p style="color: #a8b2d1;">
+                    ✨ What's New: {} insights<br>
+                    🧩 Open Problems: {} identified<br>
+                    🚀 Future Directions: {} suggested
+                </p>
             </div>
-            """.format(len(papers)), unsafe_allow_html=True)
-
-        except requests.exceptions.Timeout:
-        progress_bar.empty()
-        status_text.empty()
-            st.error("❌ Request timed out. Try again or reduce the number of papers.")
-        except Exception as e:
-        progress_bar.empty()
-        status_text.empty()
-        st.error(f"⚠️ Error: {str(e)}")
-        st.exception(e)
+            """.format(
+                len(summary.get("paragraphs", [])),
+                len(summary.get("whats_new", [])),
+                len(summary.get("open_problems", [])),
+                len(summary.get("future_work", []))
+            ), unsafe_allow_html=True)
+
+        st.markdown("<br>", unsafe_allow_html=True)
+
+        # Word cloud placeholder
+        st.markdown("""
+        <div class="glass-card">
+            <h3 style="color: #9f7aea; margin-bottom: 1rem;">🔑 Key Takeaways</h3>
+            <ul style="color: #ccd6f6; line-height: 2;">
+                <li>This research area is <strong style="color: #667eea;">actively evolving</strong> with {} recent papers</li>
+                <li>Multiple research groups are working on <strong style="color: #667eea;">innovative solutions</strong></li>
+                <li>Significant <strong style="color: #48bb78;">opportunities exist</strong> for future research</li>
+                <li>The field shows <strong style="color: #ed8936;">high collaboration</strong> among researchers</li>
+            </ul>
+        </div>
+        """.format(len(papers)), unsafe_allow_html=True)
+
+
+# ------------------- SUBMIT -------------------
+st.markdown("<br>", unsafe_allow_html=True)
+
+for name, default in (("results", None), ("jobs", {}), ("errors", {}), ("topics", {}), ("current", None)):
+    if name not in st.session_state:
+        st.session_state[name] = LRU(SESSION_CACHE_SIZE) if name == "results" else default
 
+col_btn1, col_btn2, col_btn3 = st.columns([1, 2, 1])
+with col_btn2:
+    generate_btn = st.button("🚀 Generate AI Summary", use_container_width=True)
+
+if generate_btn and topic:
+    st.session_state.search_count += 1
+    try:
+        sources = ("arxiv",)
+        start(result_key(topic, n_papers, sources), topic, n_papers, sources)
+    except requests.exceptions.RequestException as e:
+        st.error(f"❌ Could not reach the API: {e}")
 elif generate_btn and not topic:
     st.warning("⚠️ Please enter a research topic first!")
+
+# what to show survives reruns (widget changes, polling), unlike the button state
+current = st.session_state.current
+result = cached_result(current) if current else None
+
+if current and current in st.session_state.errors:
+    st.error(f"⚠️ Error: {st.session_state.errors[current]}")
+elif current and result is not None:
+    shown_topic = st.session_state.topics.get(current, current[0])
+    papers = result.get("papers") or []
+    if st.session_state.pop("celebrate", None) == current:
+        st.balloons()
+    st.success(f"✅ Successfully analyzed {len(papers)} research papers on **{shown_topic}**!")
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    render_results(shown_topic, result.get("summary") or {}, result.get("eval") or {}, papers)
+elif current and current in st.session_state.jobs:
+    job_progress(current)
 else:
     # Welcome screen when no search has been made
     st.markdown("<br><br>", unsafe_allow_html=True)